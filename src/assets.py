@@ -1,46 +1,145 @@
-from copy import copy
+from itertools import chain
 import random
 
+from yape.cache import LRUCache
 from yape.components import Component, LoadableComponent
-from yape.utils import word_wrap
+from yape.layers import TileLayer
+from yape.entities import EntityRegistry
+from yape.preload import Preloader
+from yape.pathfinding import (distance_field, label_regions, DistanceField,
+    UNREACHABLE)
+from yape import grid
+from yape import swarm
+from yape.utils import validate_data_against_schema
 
 
 class Questions(LoadableComponent):
+    """
+    The bank of questions asked when a monster catches the player. Questions
+    are loaded from a JSON list, or from a file with one JSON question per
+    line (.jsonl), which is indexed and read one question at a time so that
+    large banks load quickly. Questions are picked without repeats until all
+    have been asked. Questions are displayed as paragraphs, which are laid
+    out when the popup is drawn.
+    """
+
     path = 'config'
     schema = [
         'question',
         'answers',
         'correct',
     ]
-
-    def __init__(self, manager, config):
-        self.width = config.popup_box['char_width']
+    # The number of questions that have been read kept for reuse
+    prepared_cache_size = 32
+    # Replaced by the loaded bank, and left empty if it could not be loaded
+    questions = ()
+    # The indexes of the questions that failed validation
+    invalid = frozenset()
+
+    def __init__(self, manager, config, rng=None):
+        self.rng = rng or random
+        self.lazy = config.questions.endswith('.jsonl')
         super(Questions, self).__init__(manager, config.questions)
         self.next()
 
+    def load_location(self, location):
+        if self.lazy:
+            self.raw_data = self.manager.get_json_lines(self.path, location)
+        else:
+            super(Questions, self).load_location(location)
+
+    def reload(self):
+        super(Questions, self).reload()
+        self.next()
+
+    def is_valid(self, raw_data):
+        # Questions read one at a time are validated as they are prepared,
+        # rather than reading the whole file up front
+        if self.lazy or raw_data is None:
+            return raw_data is not None
+        return super(Questions, self).is_valid(raw_data)
+
     def next(self):
-        self.current_index = random.choice(range(len(self.questions)))
-        self.current_question = self.questions[self.current_index]
+        """
+        Picks the next question to ask. Raises a ValueError if the bank has
+        no valid question, which is first checked when the bank is loaded.
+        """
+        prepared = None
+        while prepared is None:
+            if len(self.invalid) == len(self.questions):
+                raise ValueError(
+                    'There are no valid questions in {0}'.format(self.location)
+                )
+            self.current_index = self._pick_index()
+            if self.current_index in self.invalid:
+                continue
+            prepared = self._prepare(self.current_index)
+            if prepared is None:
+                self.invalid.add(self.current_index)
+        self.current_question = prepared
         self.choice = 0
         self._question_display = None
 
     def post_process(self):
         self.questions = self.raw_data
-        self.question_displays = [
-            word_wrap(question['question'], self.width)
-            for question in self.questions
-        ]
+        self.prepared = LRUCache(self.prepared_cache_size)
+        self.invalid = set()
+        self._reset_picks()
+
+    def _reset_picks(self):
+        # Questions are picked with a Fisher-Yates shuffle that is done one
+        # step per pick. Positions that were swapped are kept in a dictionary
+        # rather than shuffling a list of every question up front
+        self._remaining = len(self.questions)
+        self._swapped = {}
+
+    def _pick_index(self):
+        """
+        Returns the index of a random question that has not been picked since
+        every question was last picked.
+        """
+        if not self._remaining:
+            self._reset_picks()
+        position = self.rng.randrange(self._remaining)
+        last = self._remaining - 1
+        index = self._swapped.get(position, position)
+        self._swapped[position] = self._swapped.pop(last, last)
+        self._remaining = last
+        return index
+
+    def _prepare(self, index):
+        """
+        Returns the question at `index`, or None if the question is invalid.
+        """
+        question = self.prepared.get(index)
+        if question is None:
+            question = self.questions[index]
+            if self.lazy and not validate_data_against_schema(question, self.schema):
+                print 'Question {0} is not valid: {1}'.format(index, question)
+                return None
+            self.prepared[index] = question
+        return question
 
     def get_choices_length(self):
         return len(self.current_question['answers'])
 
     def get_question_display(self):
-        question_display = copy(self.question_displays[self.current_index])
-        question_display.append('')
+        """
+        Returns a tuple of the paragraphs displaying the current question and
+        its answers, with the current choice marked. The paragraphs are only
+        built again when the question or the choice changes.
+        """
+        key = (self.current_index, self.choice)
+        if self._question_display is None or self._question_display[0] != key:
+            self._question_display = (key, self._build_question_display())
+        return self._question_display[1]
+
+    def _build_question_display(self):
+        question_display = [self.current_question['question'], '']
         for index, answer in enumerate(self.current_question['answers']):
             prefix = '[X] ' if index == self.choice else '[ ] '
-            question_display.extend(word_wrap(prefix + answer, self.width))
-        return question_display
+            question_display.append(prefix + answer)
+        return tuple(question_display)
 
     def is_correct(self):
         return self.choice == self.current_question['correct']
@@ -50,8 +149,11 @@ class Player(Component):
     x = 0
     y = 0
     items = []
-    last_updated = None
-    neutral = True
+    # The timer repeating the move of a joystick that is held in a direction,
+    # and the axis and direction it is held in
+    joystick_timer = None
+    joystick_axis = None
+    joystick_direction = None
 
     # Some directions constants for general use.
     UP = 'up'
@@ -75,11 +177,7 @@ class Player(Component):
         inbounds = bounds_func(self.x, self.y, width - 1, height - 1)
         if not inbounds:
             return
-        tile_solids = container.map.tile_solids
-        goal_tile_index = container.map.get_index(
-            self.x + x_modifier, self.y + y_modifier
-        )
-        if not tile_solids[goal_tile_index]:
+        if not container.map.is_solid(self.x + x_modifier, self.y + y_modifier):
             self.x += x_modifier
             self.y += y_modifier
 
@@ -95,22 +193,12 @@ class Player(Component):
     def move_right(self, container):
         self._move(container, self.RIGHT)
 
-    def post_process(self):
-        import pygame
-        # TODO: Joystick support is very experimental. This should run
-        # every few seconds or so, rather than on initialization
-        try:
-            pygame.joystick.Joystick(0).init()
-        except:
-            pass
-
 
 class Map(Component):
 
     schema = [
         'solids',
         'legend',
-        'tiles',
         {
             'dimensions': [
                 'width', 'height'
@@ -132,20 +220,188 @@ class Map(Component):
         x, y = player_start['x'], player_start['y']
         dimensions = map_data['dimensions']
         num_tiles = dimensions['width'] * dimensions['height']
-        if len(map_data['tiles']) != num_tiles:
+        # Tiles are either listed in the map data, or stored in a chunked map
+        # file that is paged in as needed
+        chunked_grid = None
+        if 'chunks' in map_data:
+            chunked_grid = self.manager.get_chunked_map(map_data['chunks'])
+            if chunked_grid is None:
+                self.error = u'The chunked map file could not be loaded'
+                return False
+            if (chunked_grid.width, chunked_grid.height) != (
+                    dimensions['width'], dimensions['height']):
+                self.error = u'The chunked map dimensions must equal width and height'
+                return False
+        elif 'tiles' not in map_data:
+            self.error = u'A map must have either tiles or chunks'
+            return False
+        elif len(map_data['tiles']) != num_tiles:
             self.error = u'Number of tiles must equal width * height'
             return False
         if x < 0 or y < 0 or x >= dimensions['width'] or y >= dimensions['height']:
             self.error = u'The player_start x or y is out of bounds'
             return False
+        # Monsters and items are spawned in the start's region, so the start
+        # must be free
+        start_index = y * dimensions['width'] + x
+        if chunked_grid is not None:
+            start_solid = chunked_grid.is_solid(start_index)
+        else:
+            start_solid = map_data['tiles'][start_index] in map_data['solids']
+        if start_solid:
+            self.error = u'The player_start is on a solid tile'
+            return False
         return True
 
+    layer = None
+    chunked_grid = None
+    # Incremented whenever a tile changes
+    version = 0
+    # How many cells from the player monsters search for a path. None
+    # searches the whole map, which is only practical for maps held in memory
+    path_radius = None
+
     def post_process(self):
-        self.tile_solids = [tile in self.solids for tile in self.tiles]
+        self.tile_images = dict(
+            (int(tile), image) for tile, image in self.legend.items()
+        )
+        chunks = getattr(self, 'chunks', None)
+        if chunks:
+            # Tiles and solidity are read from the chunked map file as needed
+            self.chunked_grid = self.manager.get_chunked_map(chunks)
+            self.tiles = self.chunked_grid.tiles
+            self.tile_solids = self.chunked_grid.solids
+            self.path_radius = self.path_radius or 32
+            return
+        # Tiles are kept in a compact array and their solidity in a
+        # bytearray with a 1 for each solid tile
+        self.tiles = grid.pack(self.tiles)
+        self.tile_solids = grid.mask(self.tiles, self.solids)
+        # Index the spawn cells while loading, rather than on first spawn
+        self.get_spawn_cells()
 
     def get_index(self, x, y):
         return y * self.dimensions['width'] + x
 
+    def get_tile(self, x, y):
+        return self.tiles[self.get_index(x, y)]
+
+    def is_solid(self, x, y):
+        return self.tile_solids[self.get_index(x, y)]
+
+    def get_tiles(self, x, y, width, height):
+        """
+        Returns a list of the rows of tiles within the rectangle at x, y with
+        the given width and height, such as the tiles in view.
+        """
+        return grid.get_rect(
+            self.tiles, self.dimensions['width'], x, y, width, height
+        )
+
+    def get_solids(self, x, y, width, height):
+        """
+        Returns a bytearray of the solidity of the cells within the rectangle
+        at x, y with the given width and height, in row-major order.
+        """
+        return bytearray(chain.from_iterable(grid.get_rect(
+            self.tile_solids, self.dimensions['width'], x, y, width, height
+        )))
+
+    def get_all_solids(self):
+        """
+        Returns a bytearray of the solidity of every cell of the map, in
+        row-major order. Chunked maps read it from the file without paging in
+        every chunk.
+        """
+        if self.chunked_grid is not None:
+            return self.chunked_grid.read_solids()
+        return self.tile_solids
+
+    def get_free_indexes(self):
+        """Returns a list of the indexes of every cell that is not solid"""
+        return grid.find(grid.invert(self.tile_solids))
+
+    def get_tile_indexes(self, tile):
+        """Returns a list of the indexes of every cell with the given tile"""
+        return grid.find(grid.mask(self.tiles, [tile]))
+
+    def get_spawn_cells(self):
+        """
+        Returns a list of the (x, y) cells that monsters and items may be
+        placed on. These are the free cells in the same connected region as
+        the player's start, other than the start itself. The list is indexed
+        when first needed and again only after the map changes.
+        """
+        if getattr(self, '_spawn_cells_version', None) != self.version:
+            width, height = self.dimensions['width'], self.dimensions['height']
+            self.regions = label_regions(self.tile_solids, width, height)
+            start_index = self.get_index(
+                self.player_start['x'], self.player_start['y']
+            )
+            start_region = self.regions[start_index]
+            self._spawn_cells = [
+                (index % width, index // width)
+                for index, region in enumerate(self.regions)
+                if region == start_region and index != start_index
+            ]
+            self._spawn_cells_version = self.version
+        return self._spawn_cells
+
+    def sample_spawn_cells(self, count, rng=random):
+        """
+        Returns a list of `count` distinct spawn cells picked at random, or
+        every spawn cell if there are not that many. Chunked maps pick from
+        the index of spawn cells written when the map was converted.
+        """
+        if self.chunked_grid is not None:
+            return self.chunked_grid.sample_spawn_cells(count, rng)
+        spawn_cells = self.get_spawn_cells()
+        return rng.sample(spawn_cells, min(count, len(spawn_cells)))
+
+    def set_view(self, x, y, width, height):
+        """
+        Given the rectangle of cells in view, releases the parts of a chunked
+        map that are out of range. Does nothing for maps held in memory.
+        """
+        if self.chunked_grid is not None:
+            self.chunked_grid.retain(x, y, width, height)
+            if self.layer is not None:
+                self.layer.retain((x, y), (width, height))
+
+    def get_tile_image(self, x, y):
+        return self.tile_images.get(self.tiles[self.get_index(x, y)], '')
+
+    def get_layer(self, screen):
+        """
+        Returns a TileLayer that pre-renders the map's tiles for the given
+        screen. The layer is created on first use and reused afterward.
+        """
+        if self.layer is None:
+            self.layer = TileLayer(
+                screen, self.dimensions['width'], self.dimensions['height'],
+                self.get_tile_image
+            )
+            if self.chunked_grid is not None:
+                # Render the same chunks that are paged in from the file
+                self.layer.chunk_size = self.chunked_grid.chunk_size
+        return self.layer
+
+    def set_tile(self, x, y, tile):
+        if self.chunked_grid is not None:
+            raise TypeError('The tiles of a chunked map are read-only')
+        index = self.get_index(x, y)
+        try:
+            self.tiles[index] = tile
+        except OverflowError:
+            # The tile does not fit the array's typecode, so repack the tiles
+            tiles = self.tiles.tolist()
+            tiles[index] = tile
+            self.tiles = grid.pack(tiles)
+        self.tile_solids[index] = 1 if tile in self.solids else 0
+        self.version += 1
+        if self.layer is not None:
+            self.layer.invalidate(x, y)
+
 
 class Item(Component):
 
@@ -158,12 +414,8 @@ class Item(Component):
 
     image_fields = ['image']
 
-    def __init__(self, *args, **kwargs):
-        self.width = kwargs.pop('width', 20)
-        super(Item, self).__init__(*args, **kwargs)
-
     def post_process(self):
-        self.message = word_wrap(self.message, self.width) + ['', 'Press "Enter" to continue']
+        self.message = (self.message, '', 'Press "Enter" to continue')
 
 
 class Monster(Component):
@@ -175,34 +427,19 @@ class Monster(Component):
 
     x = 0
     y = 0
-    last_moved_at = 0
 
     image_fields = ['image']
 
-    def place_on_map(self, map_data):
-        found_spot = False
-        while found_spot is False:
-            # Pick a random spot on the map
-            x = random.randrange(map_data.dimensions['width'])
-            y = random.randrange(map_data.dimensions['height'])
-            # map.tile_solids will be false if spot is not yet taken
-            found_spot = not map_data.tile_solids[map_data.get_index(x, y)]
-            if (x, y) == (map_data.player_start['x'], map_data.player_start['y']):
-                # don't start on top of player
-                found_spot = False
-        self.x, self.y = x, y
-
     def move(self, level, player):
         """Move the monster.
 
-        Needs 'level' so we can make sure not to step on solids. Needs
-        'player' so we can aim for the player.
+        Needs 'level' so we can make sure not to step on solids and to find
+        the shortest path around them. Needs 'player' so we can aim for the
+        player.
         """
         map_width, map_height = level.map.dimensions['width'], level.map.dimensions['height']
-        tile_solids = level.map.tile_solids
-        mc = level.monster_coordinates
-        # Remove self from monster_coordinates
-        del mc[self.id]
+        field = level.get_distance_field(player)
+        position = (self.x, self.y)
 
         all_possible_moves = [(self.x + 1, self.y),
                               (self.x - 1, self.y),
@@ -214,20 +451,32 @@ class Monster(Component):
             # on the map?
             if x >= 0 and y >= 0 and x < map_width and y < map_height:
                 # not on a solid?
-                if not tile_solids[level.map.get_index(x, y)]:
+                if not level.map.is_solid(x, y):
                     # not on another monster?
-                    if (x, y) not in mc.values():
+                    if (x, y) == position or not level.has_monster_at((x, y)):
                         free_moves.append((x, y))
 
-        min_distance = len(tile_solids) + 1  # start with big number
-        best_move = (-1, -1)
+        min_rank = None
+        best_move = position
         for move in free_moves:
-            distance = self._distance_from_player(move, player)
-            if distance < min_distance:
-                min_distance = distance
+            rank = self._rank_move(move, field, level, player)
+            if min_rank is None or rank < min_rank:
+                min_rank = rank
                 best_move = move
-        self.x, self.y = best_move
-        mc.update({self.id: best_move})
+        level.move_monster(self, best_move)
+
+    def _rank_move(self, position, field, level, player):
+        """
+        Return a sortable rank for moving to the given position, lower being
+        better. Moves are ranked by the number of steps to the player along
+        the level's distance field, then by the crude distance to the player,
+        which is also used when the player can not be reached at all.
+        """
+        x, y = position
+        steps = field.get(x, y)
+        if steps == UNREACHABLE:
+            steps = len(field.distances)
+        return steps, self._distance_from_player(position, player)
 
     def _distance_from_player(self, position, player):
         """Return a crude distance calculation between 2 positions.
@@ -246,9 +495,19 @@ class Level(LoadableComponent):
         'items'
     ]
 
-    def __init__(self, manager, config):
+    # Kinds of entities in the level's entity registry
+    ITEM = 'item'
+    MONSTER = 'monster'
+    # Whether winning this level ends the game
+    is_last = True
+    # Whether monsters are moved together with NumPy, for levels with very
+    # many monsters. Set with a "swarm" key in the level's JSON
+    swarm = False
+
+    def __init__(self, manager, config, rng=None, location=None):
         self.config = config
-        super(Level, self).__init__(manager, config.start)
+        self.rng = rng or random
+        super(Level, self).__init__(manager, location or config.start)
 
     def clean_monsters(self, monster_data):
         num_monsters = monster_data['number']
@@ -257,51 +516,275 @@ class Level(LoadableComponent):
             return False
         return True
 
+    def get_image_names(self):
+        """Returns the filenames of the level's tile, item and monster images"""
+        return get_image_names(self.raw_data)
+
     def post_process(self):
+        # Images drawn together in the level share atlas surfaces
+        self.manager.build_atlas(self.get_image_names())
         self.map = Map(self.manager, self.map)
+        # A reloaded level has a new map, whose version starts over, so the
+        # fields computed for the old map must not be reused
+        self._distance_field = self._distance_field_key = None
+        self._swarm_solids = self._swarm_solids_key = None
         dimensions = self.map.dimensions
         self.width, self.height = dimensions['width'], dimensions['height']
-        self.monster_data = self.monsters
+        self.entities = EntityRegistry()
+        self.monster_data = dict(self.monsters)
+        if self.swarm and not swarm.available:
+            print 'NumPy is needed for monster swarms. Moving monsters one at a time.'
+            self.swarm = False
         self.reset_monsters()
-        self.item_coordinates = []
-        items_data = self.items
-        self.items = []
+        self.items = [
+            Item(self.manager, item_data) for item_data in self.items
+        ]
+        self._place_items()
+
+    def _place_items(self):
+        self.entities.clear(self.ITEM)
         item_locations = self._generate_item_locations(self.map)
-        for index, item_data in enumerate(items_data):
-            location = item_locations[index]
-            item = Item(self.manager, item_data, width=self.config.popup_box['char_width'])
-            self.items.append(item)
-            self.item_coordinates.append({
-                'id': item.id, 'coordinates': location
-            })
+        if len(item_locations) < len(self.items):
+            raise ValueError(
+                'The map has {0} free cells for {1} items'.format(
+                    len(item_locations), len(self.items)
+                )
+            )
+        for index, item in enumerate(self.items):
+            self.entities.add(
+                (self.ITEM, item.id), item, item_locations[index]
+            )
 
     def reset_items(self, player):
-        self.item_coordinates = []
         player.items = []
-        item_locations = self._generate_item_locations(self.map)
-        for index, item in enumerate(self.items):
-            location = item_locations[index]
-            self.item_coordinates.append({
-                'id': item.id, 'coordinates': location
-            })
+        self._place_items()
 
     def _generate_item_locations(self, map_data):
-        locations = []
-        width, height = map_data.dimensions['width'], map_data.dimensions['height']
-        for y in xrange(height):
-            for x in xrange(width):
-                if not map_data.tile_solids[map_data.get_index(x, y)]:
-                    locations.append((x, y))
-        random.shuffle(locations)
-        return locations
+        return map_data.sample_spawn_cells(len(self.items), self.rng)
+
+    def get_distance_field(self, player):
+        """
+        Returns the distance field of the steps from each cell of the map to
+        the player, shared by all monsters. It is only computed again when
+        the player moves or the map changes. If the map has a path_radius,
+        the field only covers the cells within that radius of the player.
+        """
+        key = (player.x, player.y, self.map.version)
+        if self._distance_field_key != key:
+            radius = self.map.path_radius
+            if radius is None:
+                left, top, width, height = 0, 0, self.width, self.height
+                solids = self.map.tile_solids
+            else:
+                left, top = max(player.x - radius, 0), max(player.y - radius, 0)
+                width = min(player.x + radius + 1, self.width) - left
+                height = min(player.y + radius + 1, self.height) - top
+                solids = self.map.get_solids(left, top, width, height)
+            distances = distance_field(
+                solids, width, height, (player.x - left, player.y - top)
+            )
+            self._distance_field = DistanceField(
+                distances, (left, top), width, height
+            )
+            self._distance_field_key = key
+        return self._distance_field
 
     def reset_monsters(self):
+        self.entities.clear(self.MONSTER)
         self.monsters = []
-        self.monster_coordinates = {}
-        for i in range(self.monster_data['number']):
+        # Monsters start on distinct cells, so there can be no more monsters
+        # than there are cells to place them on
+        number = self.monster_data['number']
+        locations = self.map.sample_spawn_cells(number, self.rng)
+        if not locations:
+            raise ValueError('The map has no free cells to place monsters on')
+        if len(locations) < number:
+            print 'Only {0} of {1} monsters fit on the map'.format(
+                len(locations), number
+            )
+        if self.swarm:
+            # Every monster in a swarm looks the same, so a single Monster
+            # is kept for drawing them
+            self.monster = Monster(self.manager, self.monster_data)
+            self.monster_swarm = swarm.Swarm(locations)
+            return
+        for i, location in enumerate(locations):
             self.monster_data.update({'id': i})
             monster = Monster(self.manager, self.monster_data)
-            monster.place_on_map(self.map)
+            monster.x, monster.y = location
             self.monsters.append(monster)
-            self.monster_coordinates[i] = (monster.x, monster.y)
+            self.entities.add(
+                (self.MONSTER, i), monster, (monster.x, monster.y)
+            )
 
+    def items_at(self, position):
+        return self.entities.at(position, self.ITEM)
+
+    def items_in_rect(self, x, y, width, height):
+        return self.entities.in_rect(x, y, width, height, self.ITEM)
+
+    def remove_item(self, item):
+        self.entities.remove((self.ITEM, item.id))
+
+    def move_monsters(self, player):
+        """
+        Moves each monster one step toward the player. Returns True if a
+        monster caught the player.
+        """
+        if self.swarm:
+            return self.monster_swarm.step(
+                self._get_swarm_solids(), self.width, self.height,
+                self.get_distance_field(player), (player.x, player.y)
+            )
+        caught = False
+        for monster in self.monsters:
+            monster.move(self, player)
+            if (monster.x, monster.y) == (player.x, player.y):
+                caught = True
+        return caught
+
+    def _get_swarm_solids(self):
+        key = self.map.version
+        if self._swarm_solids_key != key:
+            solids = self.map.get_all_solids()
+            self._swarm_solids = swarm.numpy.frombuffer(solids, bool).copy()
+            self._swarm_solids_key = key
+        return self._swarm_solids
+
+    def monsters_at(self, position):
+        """
+        Returns a list of the monsters at `position`. For a swarm, these are
+        the indexes of the monsters, which may be passed to remove_monster.
+        """
+        if self.swarm:
+            return self.monster_swarm.at(position)
+        return self.entities.at(position, self.MONSTER)
+
+    def monsters_in_rect(self, x, y, width, height):
+        if self.swarm:
+            return (
+                (self.monster, coordinates) for index, coordinates
+                in self.monster_swarm.in_rect(x, y, width, height)
+            )
+        return self.entities.in_rect(x, y, width, height, self.MONSTER)
+
+    def has_monster_at(self, position):
+        if self.swarm:
+            return self.monster_swarm.has(position)
+        return self.entities.has(position, self.MONSTER)
+
+    def move_monster(self, monster, position):
+        monster.x, monster.y = position
+        self.entities.move((self.MONSTER, monster.id), position)
+
+    def remove_monster(self, monster):
+        if self.swarm:
+            self.monster_swarm.remove(monster)
+            return
+        self.monsters.remove(monster)
+        self.entities.remove((self.MONSTER, monster.id))
+
+
+def get_image_names(level_data):
+    """
+    Returns the filenames of the tile, item and monster images of the level
+    with the given JSON data
+    """
+    names = list(level_data['map']['legend'].values())
+    names.extend(item_data['image'] for item_data in level_data['items'])
+    names.append(level_data['monsters']['image'])
+    return names
+
+
+class LevelSequence(object):
+    """
+    The sequence of levels to play, named by `levels` in the config or by
+    `start` if there is only one level. While a level is played, the files of
+    the next level are read and its images decoded on a worker thread, so
+    that moving on to it does not pause the game. The level itself is made
+    on the main thread when it is played, since converting its images and
+    building its atlases need the display. The most recently played levels
+    are kept, so returning to one of them is also instant.
+    """
+
+    cache_size = 3
+
+    def __init__(self, manager, config, rng=None):
+        self.manager = manager
+        self.config = config
+        self.rng = rng or random
+        self.locations = getattr(config, 'levels', None) or [config.start]
+        self.preloader = Preloader(
+            self._decode, self.cache_size, finish=self._finish
+        )
+        self.seeds = {}
+        self.played = set()
+        self.index = 0
+        self.current = None
+
+    def _decode(self, location):
+        """
+        Reads the JSON and chunked map of the level at `location` and decodes
+        its images, which may be done on a worker thread. Returns a two-tuple
+        of the level's JSON and the decoded images, which keeps them cached
+        until the level is finished.
+        """
+        level_data = self.manager.get_json(Level.path, location)
+        if level_data is None or not validate_data_against_schema(
+                level_data, Level.schema):
+            # The level reports what is wrong when it is made
+            return level_data, {}
+        chunks = level_data['map'].get('chunks')
+        if chunks:
+            self.manager.get_chunked_map(chunks)
+        images = self.manager.decode_images(get_image_names(level_data))
+        return level_data, images
+
+    def _finish(self, location, decoded):
+        level_data, images = decoded
+        self.manager.finish_images(images)
+        # Each level has its own generator, seeded on the main thread, so that
+        # a seeded game is reproducible even when levels load on other threads
+        return Level(
+            self.manager, self.config, rng=random.Random(self.seeds[location]),
+            location=location
+        )
+
+    def _get_level(self, location, prefetch=False):
+        if location not in self.seeds:
+            self.seeds[location] = self.rng.getrandbits(32)
+        if prefetch:
+            self.preloader.prefetch(location)
+        else:
+            return self.preloader.get(location)
+
+    def has_next(self):
+        return self.index + 1 < len(self.locations)
+
+    def start(self, player):
+        """Starts the first level, placing the `player` at its start"""
+        self.index = 0
+        self._play(player)
+
+    def advance(self, player):
+        """
+        Starts the next level, placing the `player` at its start. Waits for
+        the level if it has not finished loading.
+        """
+        self.index += 1
+        self._play(player)
+
+    def _play(self, player):
+        location = self.locations[self.index]
+        level = self._get_level(location)
+        player.items = []
+        if location in self.played:
+            level.reset_items(player)
+            level.reset_monsters()
+        self.played.add(location)
+        level.is_last = not self.has_next()
+        player.x = level.map.player_start['x']
+        player.y = level.map.player_start['y']
+        self.current = level
+        if self.has_next():
+            self._get_level(self.locations[self.index + 1], prefetch=True)
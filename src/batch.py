@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+Runs many seeded headless games across a pool of processes and reports the
+win rate for each number of monsters, for balance tuning. For example:
+
+    python batch.py --games 1000 --monsters 1 2 4 8
+"""
+
+import argparse
+import multiprocessing
+
+from yape.manager import HeadlessManager
+
+from config import ASSETS_DIR, Config
+from simulation import Simulation
+
+# The manager and config of each worker process, loaded once per process
+_worker = {}
+
+
+def init_worker():
+    manager = HeadlessManager(ASSETS_DIR)
+    _worker['manager'] = manager
+    _worker['config'] = Config(manager)
+
+
+def run_game(job):
+    seed, monsters, accuracy, max_ticks = job
+    simulation = Simulation(
+        seed, monsters=monsters, accuracy=accuracy,
+        manager=_worker['manager'], config=_worker['config']
+    )
+    return simulation.run(max_ticks)
+
+
+def batch(games, monster_counts, accuracy=0.75, max_ticks=600000,
+          processes=None):
+    """
+    Plays `games` games with seeds 0 to games - 1 for each number of monsters
+    in `monster_counts`. Returns a dictionary of the results of each game by
+    number of monsters.
+    """
+    jobs = [
+        (seed, monsters, accuracy, max_ticks)
+        for monsters in monster_counts
+        for seed in xrange(games)
+    ]
+    pool = multiprocessing.Pool(processes, init_worker)
+    try:
+        results = {}
+        for result in pool.imap_unordered(run_game, jobs, chunksize=16):
+            results.setdefault(result['monsters'], []).append(result)
+    finally:
+        pool.close()
+        pool.join()
+    return results
+
+
+def report(results):
+    """Returns a list of lines summarizing the results of batch"""
+    lines = ['{0:>8} {1:>6} {2:>8} {3:>10} {4:>10}'.format(
+        'monsters', 'games', 'win rate', 'mean time', 'questions'
+    )]
+    for monsters in sorted(results):
+        games = results[monsters]
+        wins = [game for game in games if game['won']]
+        mean_ticks = (
+            sum(game['ticks'] for game in wins) / float(len(wins))
+            if wins else 0
+        )
+        mean_answers = sum(game['answers'] for game in games) / float(len(games))
+        lines.append('{0:>8} {1:>6} {2:>8.1%} {3:>9.1f}s {4:>10.1f}'.format(
+            monsters, len(games), len(wins) / float(len(games)),
+            mean_ticks / 1000.0, mean_answers
+        ))
+    return lines
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Play many headless games and report win rates'
+    )
+    parser.add_argument(
+        '--games', type=int, default=100,
+        help='Number of games for each number of monsters'
+    )
+    parser.add_argument(
+        '--monsters', type=int, nargs='+', default=[1, 2, 4],
+        help='Numbers of monsters to play with'
+    )
+    parser.add_argument(
+        '--accuracy', type=float, default=0.75,
+        help='Chance of answering a question correctly'
+    )
+    parser.add_argument(
+        '--max-time', type=int, default=600,
+        help='Seconds of game time before a game counts as lost'
+    )
+    parser.add_argument(
+        '--processes', type=int, help='Number of worker processes'
+    )
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = batch(
+        args.games, args.monsters, accuracy=args.accuracy,
+        max_ticks=args.max_time * 1000, processes=args.processes
+    )
+    print '\n'.join(report(results))
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""
+Replays a recorded session without a display and reports the frame rate and
+the time spent in each phase of the game loop. Record a session by playing
+the game with:
+
+    python main.py --record session.jsonl
+
+and benchmark it with:
+
+    python benchmark.py session.jsonl
+"""
+
+import argparse
+import os
+
+# Use SDL's dummy drivers so that no window is opened and no sound is played.
+# These must be set before pygame is initialized
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from yape.profiling import PhaseTimer
+from yape.replay import EventPlayer, ReplayFinished
+
+from main import setup, game_loop
+
+
+def benchmark(path):
+    player_source = EventPlayer(path)
+    game_data, questions, levels, player = setup(player_source.header.get('seed'))
+    game_data.dispatcher.event_source = player_source
+    game_data.clock.get_ticks = player_source.get_ticks
+    # Render as fast as possible rather than capping the frame rate
+    game_data.clock.fps = 0
+    timer = PhaseTimer()
+    try:
+        game_loop('exit', game_data, questions, levels, player, timer=timer)
+    except ReplayFinished:
+        pass
+    return timer, game_data.manager.cache_stats()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Replay a recorded session headless and report timings'
+    )
+    parser.add_argument('recording', help='A file recorded with main.py --record')
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    timer, cache_stats = benchmark(args.recording)
+    print '\n'.join(timer.report())
+    print 'assets: {size} cached, {bytes} bytes, {hits} hits, {misses} misses, {evictions} evictions'.format(**cache_stats)
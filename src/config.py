@@ -1,6 +1,10 @@
 import os
+import threading
  
-import pygame
+try:
+    import pygame
+except ImportError:
+    pygame = None
 
 from yape.components import LoadableComponent
 
@@ -36,7 +40,6 @@ class Config(LoadableComponent):
         {
             'joystick': [
                 'delay',
-                'pressed'
             ]
         }
     ]
@@ -51,17 +54,37 @@ class Config(LoadableComponent):
         'score_font',
     ]
 
+    # The megabytes of memory that assets no longer in use may take up before
+    # they are freed. Uses the manager's default if not set
+    asset_cache_mb = None
+    # The music that was started, so that reloading the config does not
+    # start it over
+    playing_music = None
+
     def post_process(self):
+        if self.asset_cache_mb is not None:
+            self.manager.set_cache_budget(int(self.asset_cache_mb * 1024 * 1024))
+        if self.manager.headless:
+            # There is no display or mixer to set up
+            return
         delay = self.keypress_repeat['delay']
         interval = self.keypress_repeat['interval']
         pygame.key.set_repeat(delay, interval)
-        # Play background music if possible
-        if self.music:
-            try:
-                filename = self.music
-                music_path_filename = os.path.join(self.manager.path, 'music', filename)
-                pygame.mixer.music.load(music_path_filename)
-                pygame.mixer.music.play(-1)
-            except pygame.error:
-                pass
+        # Play background music if possible. Loading the music can take a
+        # while on slow storage, so it is started on another thread rather
+        # than holding up the game
+        if self.music and self.music != self.playing_music:
+            self.playing_music = self.music
+            thread = threading.Thread(target=self._play_music)
+            thread.daemon = True
+            thread.start()
+
+    def _play_music(self):
+        try:
+            filename = self.music
+            music_path_filename = os.path.join(self.manager.path, 'music', filename)
+            pygame.mixer.music.load(music_path_filename)
+            pygame.mixer.music.play(-1)
+        except pygame.error:
+            pass
 
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Converts the map of a level from the JSON tile list to the chunked binary map
+format, which is paged in as needed rather than loaded in full. Given the
+level maps/map1.json, writes the map to maps/map1.rzm and a copy of the level
+that refers to it to maps/map1.chunked.json. Set `start` in config.json to
+the new level to play it.
+
+    python convert_map.py map1.json
+"""
+
+import argparse
+import json
+import os
+
+from yape import grid
+from yape.chunkmap import write_chunked_map, SOLID, SPAWN
+from yape.pathfinding import label_regions, UNREACHABLE
+
+from config import ASSETS_DIR
+
+
+def get_flags(map_data):
+    """
+    Returns a list of the flags for each cell of the map, marking solid cells
+    and the free cells reachable from the player's start that monsters and
+    items may be placed on.
+    """
+    width = map_data['dimensions']['width']
+    height = map_data['dimensions']['height']
+    solids = grid.mask(map_data['tiles'], map_data['solids'])
+    regions = label_regions(solids, width, height)
+    start_index = map_data['player_start']['y'] * width + map_data['player_start']['x']
+    start_region = regions[start_index]
+    if start_region == UNREACHABLE:
+        raise ValueError('The player_start is on a solid tile')
+    flags = []
+    for index, solid in enumerate(solids):
+        cell_flags = SOLID if solid else 0
+        if regions[index] == start_region and index != start_index:
+            cell_flags |= SPAWN
+        flags.append(cell_flags)
+    return flags
+
+
+def convert(name, chunk_size=16):
+    maps_dir = os.path.join(ASSETS_DIR, 'maps')
+    base_name = os.path.splitext(name)[0]
+    with open(os.path.join(maps_dir, name)) as f:
+        level_data = json.load(f)
+    map_data = level_data['map']
+    if max(map_data['tiles']) > 255:
+        raise ValueError('Chunked maps only support tile ids up to 255')
+    chunks_name = base_name + '.rzm'
+    write_chunked_map(
+        os.path.join(maps_dir, chunks_name),
+        map_data['tiles'], get_flags(map_data),
+        map_data['dimensions']['width'], map_data['dimensions']['height'],
+        chunk_size=chunk_size
+    )
+    del map_data['tiles']
+    map_data['chunks'] = chunks_name
+    level_name = base_name + '.chunked.json'
+    with open(os.path.join(maps_dir, level_name), 'w') as f:
+        json.dump(level_data, f, indent=4)
+    return chunks_name, level_name
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Convert a level map to the chunked binary map format'
+    )
+    parser.add_argument('level', help='The filename of a level in assets/maps')
+    parser.add_argument(
+        '--chunk-size', type=int, default=16,
+        help='The width and height of each chunk in tiles'
+    )
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    for filename in convert(args.level, args.chunk_size):
+        print 'Wrote {0}'.format(filename)
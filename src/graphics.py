@@ -1,14 +1,30 @@
+from yape.cache import LRUCache
+
+
+INFO_MESSAGE = (
+    'Honey Badger got you! You lost all of your items', '',
+    'Press <Enter> to return',
+)
+
+# Finished popup surfaces, keyed by the tuple of paragraphs they display, and
+# splash surfaces, keyed by their image
+popup_cache = LRUCache(32)
+
+
 def display_map(screen, config, level, player):
-    tiles = level.map.tiles
-    tile_legend = level.map.legend
-    for map_y in range(0, screen.map_display_height):
-        for map_x in range(0, screen.map_display_width):
-            x_offset, y_offset = screen.camera.get_offset(level, player)
-            current_index = level.map.get_index(
-                map_x - x_offset, map_y - y_offset
-            )
-            image = tile_legend.get(unicode(tiles[current_index]), '')
-            screen.draw_tile(image, (map_x, map_y))
+    x_offset, y_offset = screen.camera.get_offset(level, player)
+    level.map.set_view(*get_viewport(screen, level, player))
+    layer = level.map.get_layer(screen)
+    # The map is drawn onto the background and is only redrawn when the
+    # camera moves or the map's tiles change
+    screen.draw_static(
+        (layer, layer.version, x_offset, y_offset),
+        lambda surface: layer.draw(
+            (-x_offset, -y_offset),
+            (screen.map_display_width, screen.map_display_height),
+            surface=surface
+        )
+    )
 
 
 def display_player(screen, config, level, player):
@@ -17,56 +33,95 @@ def display_player(screen, config, level, player):
     )
 
 
+def get_viewport(screen, level, player):
+    """
+    Returns the x, y, width and height of the region of the level that is
+    displayed, in tiles.
+    """
+    x_offset, y_offset = screen.camera.get_offset(level, player)
+    return (
+        -x_offset, -y_offset,
+        screen.map_display_width, screen.map_display_height
+    )
+
+
 def display_monsters(screen, config, level, player):
-    for monster in level.monsters:
-        screen.draw_tile_relative(monster.image, (monster.x, monster.y), level, player)
+    viewport = get_viewport(screen, level, player)
+    screen.draw_tiles_relative([
+        (monster.image, coordinates)
+        for monster, coordinates in level.monsters_in_rect(*viewport)
+    ], level, player)
 
 
 def display_items(screen, config, level, player):
-    for item_coords in level.item_coordinates:
-        item = next((x for x in level.items if x.id == item_coords['id']), None)
-        screen.draw_tile_relative(
-            item.image, item_coords['coordinates'], level, player
-        )
+    viewport = get_viewport(screen, level, player)
+    screen.draw_tiles_relative([
+        (item.image, coordinates)
+        for item, coordinates in level.items_in_rect(*viewport)
+    ], level, player)
 
 
 def display_player_items(screen, config, level, player):
     screen.draw_text(
         config.score_font, 'Inventory:', (0, 420), 'black'
     )
-    for index, item in enumerate(player.items):
-        # Position each item from left to right with respect to ordering and
-        # on the bottom tile, adjusted by 8 for some padding
-        x = index * screen.tile_width
-        y = screen.height - screen.tile_height - 8
-        screen.draw(item.image, (x, y))
+    # Position each item from left to right with respect to ordering and
+    # on the bottom tile, adjusted by 8 for some padding
+    y = screen.height - screen.tile_height - 8
+    screen.draw_many([
+        (item.image, (index * screen.tile_width, y))
+        for index, item in enumerate(player.items)
+    ])
 
 
-def draw_popup(screen, config, level, player, strings):
-    # Create the black surface for the popup area to go onto
-    char_width = config.popup_box['char_width']
-    char_height = config.popup_box['char_height']
+def build_popup(screen, config, paragraphs):
+    font = config.score_font
+    popup_box = config.popup_box
     x_margin, y_margin = 10, 10
-    surface_width = 10 * char_width + x_margin * 2
-    surface_height = 25 * char_height + y_margin * 2
-    message_surface = screen.get_surface(surface_width, surface_height)
-    box_x, box_y = config.popup_box['x'], config.popup_box['y']
-    for index, string in enumerate(strings):
+    # Wrap the paragraphs to the width of the popup, sized by the font
+    text_width = popup_box.get('width', 10 * popup_box['char_width'])
+    if font is not None:
+        lines = screen.text_layout.layout(paragraphs, font, text_width)
+        line_height = screen.text_layout.get_line_height(font)
+    else:
+        lines, line_height = paragraphs, 0
+    # Create the black surface for the popup area to go onto
+    surface_width = text_width + x_margin * 2
+    surface_height = len(lines) * line_height + y_margin * 2
+    message_surface = screen.get_surface(surface_width, surface_height).convert()
+    for index, line in enumerate(lines):
         screen.draw_text(
-            config.score_font, string,
-            (x_margin, y_margin + index * 20), surface=message_surface
+            font, line,
+            (x_margin, y_margin + index * line_height), surface=message_surface
         )
-        screen.draw(message_surface, (box_x, box_y))
+    return message_surface
 
 
-def draw_splash(screen, config, image):
+def draw_popup(screen, config, level, player, paragraphs):
+    # Popups are only built once for each distinct tuple of paragraphs
+    message_surface = popup_cache.get(paragraphs)
+    if message_surface is None:
+        message_surface = build_popup(screen, config, paragraphs)
+        popup_cache[paragraphs] = message_surface
+    box_x, box_y = config.popup_box['x'], config.popup_box['y']
+    screen.draw(message_surface, (box_x, box_y))
+
+
+def build_splash(screen, config, image):
     width = screen.width
     height = screen.height
-    message_surface = screen.get_surface(width, height)
-    origin = (0, 0)
+    message_surface = screen.get_surface(width, height).convert()
     if image:
-        screen.draw(image, origin, surface=message_surface)
-    screen.draw(message_surface, origin)
+        screen.draw(image, (0, 0), surface=message_surface)
+    return message_surface
+
+
+def draw_splash(screen, config, image):
+    message_surface = popup_cache.get(image)
+    if message_surface is None:
+        message_surface = build_splash(screen, config, image)
+        popup_cache[image] = message_surface
+    screen.draw(message_surface, (0, 0))
 
 
 def render(game_data, questions, level, player):
@@ -89,7 +144,4 @@ def render(game_data, questions, level, player):
         if game_state.is_state('item'):
             draw_popup(screen, config, level, player, player.current_item.message)
         if game_state.is_state('info'):
-            draw_popup(screen, config, level, player, [
-                'Honey Badger got you! You lost all of your items', '',
-                'Press <Enter> to return'
-            ])
+            draw_popup(screen, config, level, player, INFO_MESSAGE)
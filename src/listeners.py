@@ -1,9 +1,20 @@
+import pygame
 from pygame.constants import (K_UP, K_DOWN, K_LEFT, K_RIGHT, K_RETURN, K_SPACE,
-    KEYDOWN, K_ESCAPE, QUIT)
-from pygame import time, JOYAXISMOTION
+    KEYDOWN, K_ESCAPE, K_F5, QUIT)
+from pygame import JOYAXISMOTION
 
 from yape.dispatch import dispatcher
 
+# How far the stick must be pushed from the middle to move the player, when
+# not set by `deadzone` in the joystick config
+JOYSTICK_DEADZONE = 0.25
+
+
+# Nothing moves in these states until a key is pressed
+dispatcher.register_static_states(
+    ['splash', 'endscreen', 'question', 'item', 'info']
+)
+
 
 @dispatcher.register_listener(['splash'])
 def splash_listener(event, game_data, *args, **kwargs):
@@ -30,6 +41,18 @@ def quit_x_listener(event, game_data, *args, **kwargs):
     game_data.state.exit()
 
 
+@dispatcher.register_listener(['main'])
+def reload_listener(event, game_data, questions, level, player):
+    if event.key == K_F5:
+        # Reload the assets that were changed since the game started
+        reloaded = game_data.manager.reload()
+        if level in reloaded:
+            # The level starts over with its new content
+            player.items = []
+            player.x = level.map.player_start['x']
+            player.y = level.map.player_start['y']
+
+
 @dispatcher.register_listener(['main'], KEYDOWN)
 def move_player_listener(event, game_data, questions, level, player):
     event_key = event.key
@@ -45,39 +68,69 @@ def move_player_listener(event, game_data, questions, level, player):
 
 @dispatcher.register_listener(['main'], JOYAXISMOTION)
 def move_player_joystick_listener(event, game_data, questions, level, player):
-    config = game_data.config
-    delay = config.joystick['delay']
-    last_updated = player.last_updated
-    value = event.value
-    move = False
-
-    if event.value == 0:
-        player.neutral = True
-        config.joystick['pressed'] = 0
+    if event.axis not in (0, 1):
+        return
+    direction = get_joystick_direction(
+        game_data, player, event.axis, event.value
+    )
+    if direction is None:
+        if event.axis == player.joystick_axis:
+            # The stick is back in the middle, so stop repeating the move
+            stop_joystick_repeat(game_data, player)
+        return
+    if direction == player.joystick_direction:
+        return
+    # Move at once, then repeat the move while the stick is held
+    stop_joystick_repeat(game_data, player)
+    getattr(player, 'move_' + direction)(level)
+    player.joystick_timer = game_data.clock.timers.call_every(
+        game_data.config.joystick['delay'], move_player_joystick,
+        event.joy, event.axis, direction
+    )
+    player.joystick_axis = event.axis
+    player.joystick_direction = direction
+
+
+def move_player_joystick(joy, axis, direction, game_data, questions, level,
+                         player):
+    # The stick may have been let go without an event reaching the listener,
+    # so check that it is still held before moving
+    value = pygame.joystick.Joystick(joy).get_axis(axis)
+    if get_joystick_direction(game_data, player, axis, value) != direction:
+        stop_joystick_repeat(game_data, player)
         return
-    if player.neutral:
-        move = True
-        player.neutral = False
-    else:
-        config.joystick['pressed'] += time.get_ticks()
-        if last_updated:
-            config.joystick['pressed'] -= last_updated
-
-    if config.joystick['pressed'] > delay:
-        move = True
-        config.joystick['pressed'] -= delay
-
-    if move:
-        if event.axis == 0:
-            if value > 0:
-                player.move_right(level)
-            else:
-                player.move_left(level)
-        elif event.axis == 1:
-            if value > 0:
-                player.move_up(level)
-            else:
-                player.move_down(level)
+    getattr(player, 'move_' + direction)(level)
+
+
+def get_joystick_direction(game_data, player, axis, value):
+    """
+    Returns the direction the stick is held in along `axis`, or None if it
+    is within the deadzone of the middle
+    """
+    deadzone = game_data.config.joystick.get('deadzone', JOYSTICK_DEADZONE)
+    if abs(value) < deadzone:
+        return None
+    if axis == 0:
+        return player.RIGHT if value > 0 else player.LEFT
+    return player.UP if value > 0 else player.DOWN
+
+
+def stop_joystick_repeat(game_data, player):
+    game_data.clock.timers.cancel(player.joystick_timer)
+    player.joystick_timer = None
+    player.joystick_axis = player.joystick_direction = None
+
+
+def watch_joystick(game_data, player):
+    """
+    Stops repeating joystick moves whenever the game leaves or returns to the
+    main state. Joystick events are only handled in the main state, so the
+    stick may be let go behind a popup without the move being stopped.
+    """
+    def state_changed(source, destination):
+        if 'main' in (source, destination):
+            stop_joystick_repeat(game_data, player)
+    game_data.state.add_observer(state_changed)
 
 
 @dispatcher.register_listener(['question'])
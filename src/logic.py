@@ -1,28 +1,27 @@
-import pygame
+def schedule(game_data):
+    """Registers the timers that drive the game with the clock"""
+    timers = game_data.clock.timers
+    timers.call_every(game_data.config.monster_delay, move_monsters)
 
 
 def logic(game_data, questions, level, player):
     if game_data.state.is_state('main'):
+        # Timers only run while playing, so nothing moves behind a popup
+        game_data.clock.timers.run(
+            game_data.clock.ticks, game_data, questions, level, player
+        )
         player_on_item(game_data, questions, level, player)
-        player_on_monster(game_data, questions, level, player)
 
 
 def player_on_item(game_data, questions, level, player):
-    player_coordinate = player.x, player.y
-    for item in level.item_coordinates:
-        if player_coordinate == item['coordinates']:
-            level.item_coordinates.remove(item)
-            item_obj = [x for x in level.items if x.id == item['id']][0]
-            game_data.state.popup_item(player, item_obj)
+    items = level.items_at((player.x, player.y))
+    if items:
+        item = items[0]
+        level.remove_item(item)
+        game_data.state.popup_item(player, item)
 
 
-def player_on_monster(game_data, questions, level, player):
-    config = game_data.config
-    ticks = pygame.time.get_ticks()
-    for monster in level.monsters:
-        if ticks > (monster.last_moved_at + config.monster_delay):
-            monster.last_moved_at = ticks
-            monster.move(level, player)
-            if (monster.x, monster.y) == (player.x, player.y):
-                game_data.state.popup_question()
+def move_monsters(game_data, questions, level, player):
+    if game_data.state.is_state('main') and level.move_monsters(player):
+        game_data.state.popup_question()
 
@@ -1,35 +1,107 @@
 #!/usr/bin/env python
 
+import argparse
+import random
+
 from yape.initialize import initialize
+from yape.profiling import PhaseTimer
+from yape.replay import EventRecorder
 
 from state import game_state
-from listeners import dispatcher
+from listeners import dispatcher, watch_joystick
 from config import ASSETS_DIR, Config
-from assets import Player, Level, Questions
-from logic import logic
+from assets import Player, LevelSequence, Questions
+from logic import logic, schedule
 from graphics import render
 
 
-def main():
+def setup(seed=None):
+    """
+    Initializes the game and returns a (game_data, questions, levels, player)
+    four-tuple. Questions and levels share a random number generator seeded
+    with `seed`, so that the same seed gives the same game.
+    """
+    rng = random.Random(seed)
     # Initialize display screen and load assets
-    game_data = initialize(game_state, dispatcher, Config, ASSETS_DIR)
-    # Load the player, questions, and level before the game begins
+    game_data = initialize(
+        game_state, dispatcher, Config, ASSETS_DIR, manifest='manifest.json'
+    )
+    # Load the player, questions, and first level before the game begins
     player = Player(game_data.manager)
-    questions = Questions(game_data.manager, game_data.config)
-    level = Level(game_data.manager, game_data.config)
+    questions = Questions(game_data.manager, game_data.config, rng=rng)
+    levels = LevelSequence(game_data.manager, game_data.config, rng=rng)
     # Place player at the start location
-    player.x = level.map.player_start['x']
-    player.y = level.map.player_start['y']
+    levels.start(player)
+    schedule(game_data)
+    watch_joystick(game_data, player)
+    return game_data, questions, levels, player
+
+
+def main(record=None, seed=None):
+    if record and seed is None:
+        # A recording can only be replayed with the seed it was made with
+        seed = random.randrange(2 ** 31)
+    game_data, questions, levels, player = setup(seed)
+    recorder = None
+    if record:
+        recorder = EventRecorder(
+            record, game_data.dispatcher.event_source,
+            get_ticks=game_data.clock.get_ticks, header={'seed': seed}
+        )
+        game_data.dispatcher.event_source = recorder
+        game_data.clock.get_ticks = recorder.get_ticks
     # Run game loop
-    game_loop('exit', game_data, questions, level, player)
+    try:
+        game_loop('exit', game_data, questions, levels, player)
+    finally:
+        if recorder:
+            recorder.close()
 
 
-def game_loop(exit_state, game_data, questions, level, player):
+def game_loop(exit_state, game_data, questions, levels, player, timer=None):
+    dispatcher, clock = game_data.dispatcher, game_data.clock
+    timer = timer or PhaseTimer(enabled=False)
+    rendered_state = None
     while not game_data.state.is_state(exit_state):
-        game_data.dispatcher.handle_events(game_data, questions, level, player)
-        logic(game_data, questions, level, player)
-        render(game_data, questions, level, player)
+        if game_data.state.is_state('loading'):
+            # The next level has usually been loaded in the background while
+            # the last one was played, so this rarely waits
+            levels.advance(player)
+            clock.reset()
+            game_data.state.level_loaded()
+        level = levels.current
+        state = game_data.state.state
+        with timer.phase('events'):
+            # Once a static state has been drawn, nothing changes until an
+            # event occurs, so wait for one rather than polling and redrawing
+            if state == rendered_state and dispatcher.is_static(state):
+                dispatcher.wait_events(game_data, questions, level, player)
+                clock.reset()
+            else:
+                dispatcher.handle_events(game_data, questions, level, player)
+        with timer.phase('logic'):
+            # Run logic in fixed timesteps, catching up if the frame ran late
+            for step in xrange(clock.steps()):
+                clock.advance()
+                logic(game_data, questions, level, player)
+        with timer.phase('render'):
+            render(game_data, questions, level, player)
+        rendered_state = game_data.state.state
+        timer.frame()
+        clock.tick()
 
-if __name__ == "__main__":
-    main()
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Play Razzy Tails')
+    parser.add_argument(
+        '--record', metavar='FILE',
+        help='Record the events of the session to FILE for replaying with benchmark.py'
+    )
+    parser.add_argument(
+        '--seed', type=int, help='Seed for the random number generator'
+    )
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(record=args.record, seed=args.seed)
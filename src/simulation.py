@@ -0,0 +1,171 @@
+"""
+Plays games of Razzy Tails without a display, for balance testing. The game
+rules are the same as in main.py, but time and random numbers are injected
+and the player is steered by a simple policy instead of the keyboard. pygame
+does not need to be installed.
+"""
+
+import random
+
+from yape.clock import Clock
+from yape.gamedata import GameData
+from yape.manager import HeadlessManager
+from yape.pathfinding import distance_field, DistanceField, UNREACHABLE
+
+from state import game_state
+from config import ASSETS_DIR, Config
+from assets import Player, LevelSequence, Questions
+from logic import logic, schedule
+
+
+class Simulation(object):
+    """
+    A single headless game, seeded with `seed`. The player walks the shortest
+    path to the nearest item, one cell every `keypress_repeat` interval, and
+    answers questions correctly with a probability of `accuracy`. Popups are
+    closed as soon as they open. If `monsters` is given, each level has that
+    many monsters instead of the number in its JSON.
+
+    Takes an optional `manager` and `config`, so that many games can be run
+    without loading the config again for each one.
+    """
+
+    # Player moves are tried in this order, so that ties are broken the same
+    # way in every run
+    directions = (Player.UP, Player.DOWN, Player.LEFT, Player.RIGHT)
+
+    def __init__(self, seed=None, monsters=None, accuracy=0.75, timestep=20,
+                 manager=None, config=None):
+        self.seed = seed
+        self.monsters = monsters
+        self.accuracy = accuracy
+        self.rng = random.Random(seed)
+        manager = manager or HeadlessManager(ASSETS_DIR)
+        config = config or Config(manager)
+        clock = Clock(timestep=timestep, get_ticks=lambda: clock.ticks)
+        # The state machine is shared, so start it over for this game
+        game_state.state = 'main'
+        self.game_data = GameData(game_state, None, None, config, manager, clock)
+        self.player = Player(manager)
+        self.questions = Questions(manager, config, rng=self.rng)
+        self.levels = LevelSequence(manager, config, rng=self.rng)
+        self.levels.start(self.player)
+        self._set_monsters(self.levels.current)
+        schedule(self.game_data)
+        self.move_interval = config.keypress_repeat['interval']
+        self.next_move_at = 0
+        self.steps = 0
+        self.moves = 0
+        self.answers = 0
+        self.correct = 0
+        self._target_field = None
+
+    def _set_monsters(self, level):
+        if self.monsters is not None:
+            level.monster_data = dict(level.monster_data, number=self.monsters)
+            level.reset_monsters()
+
+    def is_won(self):
+        return self.game_data.state.is_state('endscreen')
+
+    def run(self, max_ticks=600000):
+        """
+        Steps the game until it is won or `max_ticks` milliseconds of game
+        time have passed. Returns a dictionary of the results.
+        """
+        clock = self.game_data.clock
+        while not self.is_won() and clock.ticks < max_ticks:
+            self.step()
+        return {
+            'seed': self.seed,
+            'monsters': self.monsters,
+            'won': self.is_won(),
+            'steps': self.steps,
+            'ticks': clock.ticks,
+            'moves': self.moves,
+            'answers': self.answers,
+            'correct': self.correct,
+        }
+
+    def step(self):
+        """Runs one logic timestep of the game"""
+        game_data, level = self.game_data, self.levels.current
+        game_data.clock.advance()
+        self.steps += 1
+        self.resolve_popups()
+        if game_data.state.is_state('main'):
+            if game_data.clock.ticks >= self.next_move_at:
+                self.next_move_at = game_data.clock.ticks + self.move_interval
+                self.move_player(level)
+            logic(game_data, self.questions, level, self.player)
+
+    def resolve_popups(self):
+        """Closes any popup as a player would, answering questions at random"""
+        state, level = self.game_data.state, self.levels.current
+        if state.is_state('question'):
+            questions = self.questions
+            correct = questions.current_question['correct']
+            if self.rng.random() < self.accuracy:
+                questions.choice = correct
+            else:
+                wrong = [
+                    index for index in xrange(questions.get_choices_length())
+                    if index != correct
+                ]
+                questions.choice = self.rng.choice(wrong) if wrong else correct
+            self.answers += 1
+            self.correct += questions.is_correct()
+            state.answer(questions.is_correct(), level, self.player)
+            questions.next()
+        elif state.is_state('item'):
+            state.item_collected(level, self.player)
+        elif state.is_state('info'):
+            state.info_closed()
+        if state.is_state('loading'):
+            self.levels.advance(self.player)
+            self._set_monsters(self.levels.current)
+            self._target_field = None
+            state.level_loaded()
+
+    def move_player(self, level):
+        """Moves the player one step along the shortest path to an item"""
+        field = self._get_target_field(level)
+        if field is None:
+            return
+        player = self.player
+        best, best_distance = None, None
+        for direction in self.directions:
+            (dx, dy), in_bounds = Player._direction_mapping[direction]
+            distance = field.get(player.x + dx, player.y + dy)
+            if distance == UNREACHABLE:
+                continue
+            if best_distance is None or distance < best_distance:
+                best, best_distance = direction, distance
+        if best is not None:
+            player._move(level, best)
+            self.moves += 1
+
+    def _get_target_field(self, level):
+        """
+        Returns the distance field to the nearest item from the player, or
+        None if no item can be reached. The field is kept until the item is
+        collected or the map changes.
+        """
+        if self._target_field is not None:
+            target, version, field = self._target_field
+            if level.items_at(target) and version == level.map.version:
+                return field
+        to_player = level.get_distance_field(self.player)
+        target, nearest = None, None
+        for item, position in level.items_in_rect(0, 0, level.width, level.height):
+            distance = to_player.get(*position)
+            if distance != UNREACHABLE and (nearest is None or distance < nearest):
+                target, nearest = position, distance
+        if target is None:
+            self._target_field = None
+            return None
+        solids = level.map.get_solids(0, 0, level.width, level.height)
+        distances = distance_field(solids, level.width, level.height, target)
+        field = DistanceField(distances, (0, 0), level.width, level.height)
+        self._target_field = (target, level.map.version, field)
+        return field
@@ -59,6 +59,16 @@ transitions = [
         'source': 'main',
         'destination': 'endscreen'
     },
+    {
+        'name': 'next_level',
+        'source': 'main',
+        'destination': 'loading'
+    },
+    {
+        'name': 'level_loaded',
+        'source': 'loading',
+        'destination': 'main'
+    },
     {
         'name': 'popup_info',
         'source': 'main',
@@ -82,10 +92,8 @@ def add_item_to_inventory(player, item):
 def handle_answer(is_correct, level, player):
     if is_correct:
         # Remove all monsters on the player's current location
-        for monster in level.monsters:
-            if (monster.x, monster.y) == (player.x, player.y):
-                level.monsters.remove(monster)
-                level.monster_coordinates.pop(monster.id)
+        for monster in level.monsters_at((player.x, player.y)):
+            level.remove_monster(monster)
     else:
         level.reset_items(player)
         level.reset_monsters()
@@ -94,8 +102,11 @@ def handle_answer(is_correct, level, player):
 
 def handle_item_collected(level, player):
     if len(level.items) == len(player.items):
-        # no more items. you win!
-        game_state.end()
+        if level.is_last:
+            # no more items or levels. you win!
+            game_state.end()
+        else:
+            game_state.next_level()
 
 
 callbacks = {
@@ -0,0 +1,140 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from assets import Level
+from yape.chunkmap import write_chunked_map, ChunkedGrid, SOLID, SPAWN
+from yape.manager import HeadlessManager
+
+
+# A 4x3 map of tiles, where tile 1 is solid, written in chunks of 3 cells
+# so that the chunks along the right and bottom edges are padded
+TILES = [
+    0, 0, 1, 0,
+    1, 0, 1, 0,
+    0, 0, 1, 1,
+]
+WIDTH, HEIGHT = 4, 3
+# The free cells that can be reached from a start at (0, 0), other than
+# the start itself
+SPAWN_CELLS = [(1, 0), (1, 1), (0, 2), (1, 2)]
+
+
+def get_flags(spawn_cells):
+    flags = [SOLID if tile == 1 else 0 for tile in TILES]
+    for x, y in spawn_cells:
+        flags[y * WIDTH + x] |= SPAWN
+    return flags
+
+
+class LevelConfig(object):
+
+    def __init__(self, start):
+        self.start = start
+
+
+class ChunkedGridTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'map.rzm')
+        write_chunked_map(
+            self.path, TILES, get_flags(SPAWN_CELLS), WIDTH, HEIGHT,
+            chunk_size=3
+        )
+        self.grid = ChunkedGrid(self.path)
+
+    def tearDown(self):
+        self.grid.close()
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        self.assertEqual((self.grid.width, self.grid.height), (WIDTH, HEIGHT))
+        self.assertEqual(list(self.grid.tiles), TILES)
+        self.assertEqual(
+            [bool(solid) for solid in self.grid.solids],
+            [tile == 1 for tile in TILES]
+        )
+        spawn_cells = [
+            (index % WIDTH, index // WIDTH)
+            for index in xrange(WIDTH * HEIGHT) if self.grid.is_spawn(index)
+        ]
+        self.assertEqual(spawn_cells, SPAWN_CELLS)
+
+    def test_read_solids(self):
+        self.assertEqual(
+            list(self.grid.read_solids()),
+            [1 if tile == 1 else 0 for tile in TILES]
+        )
+
+    def test_spawn_index(self):
+        self.assertEqual(self.grid.spawn_count, len(SPAWN_CELLS))
+        self.assertEqual(
+            [self.grid.get_spawn_index(position)
+                for position in xrange(self.grid.spawn_count)],
+            [y * WIDTH + x for x, y in SPAWN_CELLS]
+        )
+
+    def test_sample_spawn_cells(self):
+        cells = self.grid.sample_spawn_cells(3, random.Random(1))
+        self.assertEqual(len(cells), 3)
+        self.assertEqual(len(set(cells)), 3)
+        self.assertTrue(set(cells) <= set(SPAWN_CELLS))
+        # Sampling reads the spawn index, not the chunks
+        self.assertEqual(len(self.grid.chunks.data), 0)
+
+    def test_sample_more_than_spawn_count(self):
+        cells = self.grid.sample_spawn_cells(10, random.Random(1))
+        self.assertEqual(sorted(cells), sorted(SPAWN_CELLS))
+
+
+class ChunkedLevelTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, 'maps'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def get_level(self, spawn_cells, num_items):
+        maps_dir = os.path.join(self.directory, 'maps')
+        write_chunked_map(
+            os.path.join(maps_dir, 'map.rzm'), TILES, get_flags(spawn_cells),
+            WIDTH, HEIGHT, chunk_size=3
+        )
+        level_data = {
+            'map': {
+                'chunks': 'map.rzm',
+                'solids': [1],
+                'legend': {'0': 'grass.png', '1': 'wall.png'},
+                'dimensions': {'width': WIDTH, 'height': HEIGHT},
+                'player_start': {'x': 0, 'y': 0},
+            },
+            'monsters': {'image': 'monster.png', 'number': 1},
+            'items': [
+                {
+                    'id': index, 'title': 'Item', 'image': 'item.png',
+                    'message': 'Found an item',
+                }
+                for index in xrange(num_items)
+            ],
+        }
+        with open(os.path.join(maps_dir, 'level.json'), 'w') as f:
+            json.dump(level_data, f)
+        return Level(
+            HeadlessManager(self.directory), LevelConfig('level.json'),
+            rng=random.Random(1)
+        )
+
+    def test_places_items_on_spawn_cells(self):
+        level = self.get_level(SPAWN_CELLS, 2)
+        for item in level.items:
+            position = level.entities.get_position((Level.ITEM, item.id))
+            self.assertIn(position, SPAWN_CELLS)
+
+    def test_too_few_spawn_cells(self):
+        self.assertRaises(ValueError, self.get_level, SPAWN_CELLS[:1], 2)
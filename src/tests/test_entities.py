@@ -0,0 +1,73 @@
+import unittest
+
+from yape.entities import EntityRegistry
+
+
+class EntityRegistryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = EntityRegistry(bucket_size=4)
+
+    def test_at_and_has(self):
+        self.registry.add(('item', 1), 'key', (2, 3))
+        self.registry.add(('monster', 1), 'badger', (2, 3))
+        self.assertEqual(
+            sorted(self.registry.at((2, 3))), ['badger', 'key']
+        )
+        self.assertEqual(self.registry.at((2, 3), 'item'), ['key'])
+        self.assertTrue(self.registry.has((2, 3), 'monster'))
+        self.assertFalse(self.registry.has((3, 3)))
+
+    def test_move_between_buckets(self):
+        self.registry.add(('monster', 1), 'badger', (1, 1))
+        self.registry.move(('monster', 1), (9, 1))
+        self.assertEqual(self.registry.get_position(('monster', 1)), (9, 1))
+        self.assertEqual(self.registry.at((1, 1)), [])
+        self.assertEqual(self.registry.at((9, 1)), ['badger'])
+        # The old bucket and cell are dropped once empty
+        self.assertNotIn((0, 0), self.registry.buckets)
+        self.assertNotIn((1, 1), self.registry.cells)
+        self.assertEqual(
+            list(self.registry.in_rect(0, 0, 4, 4)), []
+        )
+        self.assertEqual(
+            list(self.registry.in_rect(8, 0, 4, 4)), [('badger', (9, 1))]
+        )
+
+    def test_move_within_bucket(self):
+        self.registry.add(('monster', 1), 'badger', (1, 1))
+        self.registry.add(('monster', 2), 'other', (2, 2))
+        self.registry.move(('monster', 1), (2, 1))
+        self.assertEqual(len(self.registry.buckets[(0, 0)]), 2)
+        self.assertEqual(self.registry.at((2, 1)), ['badger'])
+
+    def test_remove(self):
+        self.registry.add(('item', 1), 'key', (5, 5))
+        self.registry.add(('item', 2), 'lock', (5, 5))
+        self.assertEqual(self.registry.remove(('item', 1)), 'key')
+        self.assertNotIn(('item', 1), self.registry)
+        self.assertEqual(self.registry.at((5, 5)), ['lock'])
+        self.registry.remove(('item', 2))
+        self.assertEqual(self.registry.cells, {})
+        self.assertEqual(self.registry.buckets, {})
+        self.assertEqual(len(self.registry), 0)
+
+    def test_add_replaces_key(self):
+        self.registry.add(('item', 1), 'key', (0, 0))
+        self.registry.add(('item', 1), 'lock', (6, 6))
+        self.assertEqual(self.registry.at((0, 0)), [])
+        self.assertEqual(self.registry.at((6, 6)), ['lock'])
+        self.assertEqual(len(self.registry), 1)
+
+    def test_clear_kind(self):
+        self.registry.add(('item', 1), 'key', (0, 0))
+        self.registry.add(('monster', 1), 'badger', (0, 0))
+        self.registry.clear('item')
+        self.assertEqual(self.registry.at((0, 0)), ['badger'])
+
+    def test_in_rect_edges(self):
+        self.registry.add(('item', 1), 'inside', (3, 3))
+        self.registry.add(('item', 2), 'right', (4, 3))
+        self.registry.add(('item', 3), 'below', (3, 4))
+        found = list(self.registry.in_rect(1, 1, 3, 3, 'item'))
+        self.assertEqual(found, [('inside', (3, 3))])
@@ -0,0 +1,81 @@
+import threading
+import time
+import unittest
+
+from yape.manager import GenericAssetManager
+
+
+class Asset(object):
+
+    def __init__(self, name):
+        self.name = name
+
+
+class SlowManager(GenericAssetManager):
+    """Loads assets named 'slow' only once `release` is set"""
+
+    def __init__(self):
+        super(SlowManager, self).__init__('')
+        self.condition = threading.Condition()
+        self.release = threading.Event()
+        self.loads = 0
+
+    def load(self, name):
+        with self.condition:
+            self.loads += 1
+            self.condition.notify_all()
+        if name == 'slow':
+            self.release.wait(5)
+        return Asset(name)
+
+    def wait_for_loads(self, count, timeout=5):
+        """Returns True once `count` loads have started, False on timeout"""
+        end = time.time() + timeout
+        with self.condition:
+            while self.loads < count and time.time() < end:
+                self.condition.wait(0.05)
+            return self.loads >= count
+
+
+class GenericAssetManagerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = SlowManager()
+        self.results = []
+        self.threads = []
+
+    def tearDown(self):
+        self.manager.release.set()
+        for thread in self.threads:
+            thread.join()
+
+    def get_on_thread(self, name):
+        thread = threading.Thread(
+            target=lambda: self.results.append(self.manager.get(name))
+        )
+        thread.start()
+        self.threads.append(thread)
+
+    def test_get_cached(self):
+        asset = self.manager.get('fast')
+        self.assertIs(self.manager.get('fast'), asset)
+        self.assertEqual(self.manager.loads, 1)
+
+    def test_load_does_not_block_get(self):
+        self.get_on_thread('slow')
+        self.assertTrue(self.manager.wait_for_loads(1))
+        # Getting another asset does not wait for the slow one to load
+        start = time.time()
+        fast = self.manager.get('fast')
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(fast.name, 'fast')
+
+    def test_concurrent_loads_keep_one_asset(self):
+        self.get_on_thread('slow')
+        self.get_on_thread('slow')
+        self.assertTrue(self.manager.wait_for_loads(2))
+        self.manager.release.set()
+        for thread in self.threads:
+            thread.join()
+        self.assertIs(self.results[0], self.results[1])
+        self.assertIs(self.manager.get('slow'), self.results[0])
@@ -0,0 +1,83 @@
+import unittest
+
+from yape.pathfinding import (distance_field, label_regions, DistanceField,
+    UNREACHABLE)
+
+
+# A 5 by 4 grid, where # is solid. The cell at the bottom right is walled in
+GRID = [
+    '..#..',
+    '..#..',
+    '.....',
+    '...##',
+]
+WIDTH, HEIGHT = 5, 4
+
+
+def get_solids(rows):
+    return bytearray(1 if cell == '#' else 0 for row in rows for cell in row)
+
+
+class DistanceFieldTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.solids = get_solids(GRID)
+
+    def test_distances(self):
+        distances = distance_field(self.solids, WIDTH, HEIGHT, (0, 0))
+        self.assertEqual(list(distances), [
+            0, 1, -1, 7, 8,
+            1, 2, -1, 6, 7,
+            2, 3, 4, 5, 6,
+            3, 4, 5, -1, -1,
+        ])
+
+    def test_limit(self):
+        distances = distance_field(self.solids, WIDTH, HEIGHT, (0, 0), limit=3)
+        self.assertEqual(distances[3 * WIDTH + 0], 3)
+        self.assertEqual(distances[2 * WIDTH + 2], UNREACHABLE)
+
+    def test_start_out_of_bounds(self):
+        distances = distance_field(self.solids, WIDTH, HEIGHT, (5, 0))
+        self.assertEqual(set(distances), set([UNREACHABLE]))
+
+    def test_does_not_wrap_rows(self):
+        solids = bytearray(2 * 3)
+        # Cells at the end of a row are not next to the start of the next
+        solids[1] = 1
+        distances = distance_field(solids, 2, 3, (0, 0))
+        self.assertEqual(list(distances), [0, -1, 1, 2, 2, 3])
+
+    def test_window(self):
+        # A 2 by 2 window with its top left cell at 3, 1 of a larger grid
+        distances = distance_field(bytearray(4), 2, 2, (0, 0))
+        field = DistanceField(distances, (3, 1), 2, 2)
+        self.assertEqual(field.get(3, 1), 0)
+        self.assertEqual(field.get(4, 2), 2)
+        self.assertEqual(field.get(0, 0), UNREACHABLE)
+        self.assertEqual(field.get(5, 1), UNREACHABLE)
+
+
+class LabelRegionsTestCase(unittest.TestCase):
+
+    def test_regions(self):
+        rows = [
+            '.#..',
+            '.#.#',
+            '##..',
+            '..#.',
+        ]
+        labels = label_regions(get_solids(rows), 4, 4)
+        self.assertEqual(list(labels), [
+            0, -1, 1, 1,
+            0, -1, 1, -1,
+            -1, -1, 1, 1,
+            2, 2, -1, 1,
+        ])
+
+    def test_does_not_wrap_rows(self):
+        solids = get_solids(['.#', '.#', '#.'])
+        labels = label_regions(solids, 2, 3)
+        # The last cell of the first row and the first of the second are
+        # not neighbors
+        self.assertEqual(list(labels), [0, -1, 0, -1, -1, 1])
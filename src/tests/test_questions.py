@@ -0,0 +1,71 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from assets import Questions
+from yape.manager import HeadlessManager
+
+
+class QuestionsConfig(object):
+
+    def __init__(self, questions):
+        self.questions = questions
+
+
+def get_question(index):
+    return {
+        'question': 'Question {0}'.format(index),
+        'answers': ['Yes', 'No'],
+        'correct': 0,
+    }
+
+
+class QuestionsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, 'config'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def get_questions(self, questions, filename='questions.json'):
+        with open(os.path.join(self.directory, 'config', filename), 'w') as f:
+            if filename.endswith('.jsonl'):
+                for question in questions:
+                    f.write(json.dumps(question) + '\n')
+            else:
+                json.dump(questions, f)
+        return Questions(
+            HeadlessManager(self.directory), QuestionsConfig(filename),
+            rng=random.Random(1)
+        )
+
+    def test_pick_index_covers_every_question(self):
+        questions = self.get_questions([get_question(i) for i in xrange(7)])
+        questions._reset_picks()
+        for cycle in xrange(3):
+            picked = [questions._pick_index() for _ in xrange(7)]
+            # No question repeats until every question has been picked
+            self.assertEqual(sorted(picked), range(7))
+
+    def test_pick_index_single_question(self):
+        questions = self.get_questions([get_question(0)])
+        self.assertEqual([questions._pick_index() for _ in xrange(3)], [0] * 3)
+
+    def test_next_skips_invalid_questions(self):
+        bank = [get_question(0), {'question': 'No answers'}, get_question(2)]
+        questions = self.get_questions(bank, 'questions.jsonl')
+        for _ in xrange(6):
+            questions.next()
+            self.assertIn(questions.current_index, (0, 2))
+        self.assertEqual(questions.invalid, set([1]))
+
+    def test_no_valid_questions(self):
+        bank = [{'question': 'No answers'}, {'answers': []}]
+        self.assertRaises(
+            ValueError, self.get_questions, bank, 'questions.jsonl'
+        )
@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from yape.records import JSONLinesFile
+
+
+class CountingJSONLinesFile(JSONLinesFile):
+    """A JSONLinesFile that counts how many times its index was built"""
+
+    builds = 0
+
+    def _build_index(self):
+        CountingJSONLinesFile.builds += 1
+        return super(CountingJSONLinesFile, self)._build_index()
+
+
+class JSONLinesFileTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'questions.jsonl')
+        CountingJSONLinesFile.builds = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, lines, mtime):
+        with open(self.path, 'wb') as f:
+            f.write(''.join(line + '\n' for line in lines))
+        os.utime(self.path, (mtime, mtime))
+
+    def read(self):
+        records = CountingJSONLinesFile(self.path)
+        try:
+            return [records[index] for index in xrange(len(records))]
+        finally:
+            records.close()
+
+    def test_skips_blank_lines(self):
+        self.write(['{"a": 1}', '', '  ', '[2, 3]', '"four"'], 1000)
+        self.assertEqual(self.read(), [{'a': 1}, [2, 3], 'four'])
+
+    def test_reuses_index(self):
+        self.write(['1', '2'], 1000)
+        self.assertEqual(self.read(), [1, 2])
+        self.assertTrue(os.path.exists(self.path + '.idx'))
+        self.assertEqual(self.read(), [1, 2])
+        self.assertEqual(CountingJSONLinesFile.builds, 1)
+
+    def test_rebuilds_stale_index(self):
+        self.write(['1', '2'], 1000)
+        self.assertEqual(self.read(), [1, 2])
+        # The same number of bytes, so only the modification time changed
+        self.write(['3', '4'], 2000)
+        self.assertEqual(self.read(), [3, 4])
+        self.write(['"longer"', '5', '6'], 2000)
+        self.assertEqual(self.read(), ['longer', 5, 6])
+        self.assertEqual(CountingJSONLinesFile.builds, 3)
+
+    def test_rebuilds_corrupt_index(self):
+        self.write(['1', '2'], 1000)
+        with open(self.path + '.idx', 'wb') as f:
+            f.write('bad')
+        self.assertEqual(self.read(), [1, 2])
+        self.assertEqual(CountingJSONLinesFile.builds, 1)
@@ -0,0 +1,46 @@
+import unittest
+
+from yape import swarm
+from yape.pathfinding import distance_field, DistanceField
+
+numpy = swarm.numpy
+
+
+@unittest.skipUnless(swarm.available, 'NumPy is not installed')
+class SwarmStepTestCase(unittest.TestCase):
+
+    def step(self, agents, target, width=3, height=1):
+        solids = numpy.zeros(width * height, bool)
+        field = DistanceField(
+            distance_field(bytearray(width * height), width, height, target),
+            (0, 0), width, height
+        )
+        on_target = agents.step(solids, width, height, field, target)
+        return on_target, zip(agents.xs.tolist(), agents.ys.tolist())
+
+    def test_staying_agent_blocks_mover(self):
+        # Agent 0 is on the target and stays, so agent 1 cannot move onto it
+        agents = swarm.Swarm([(1, 0), (0, 0)])
+        on_target, positions = self.step(agents, (1, 0))
+        self.assertTrue(on_target)
+        self.assertEqual(positions, [(1, 0), (0, 0)])
+
+    def test_lowest_index_wins_cell(self):
+        # Both agents choose the target between them
+        agents = swarm.Swarm([(2, 0), (0, 0)])
+        on_target, positions = self.step(agents, (1, 0))
+        self.assertTrue(on_target)
+        self.assertEqual(positions, [(1, 0), (0, 0)])
+
+    def test_moves_toward_target(self):
+        agents = swarm.Swarm([(0, 0)])
+        on_target, positions = self.step(agents, (4, 0), width=5)
+        self.assertFalse(on_target)
+        self.assertEqual(positions, [(1, 0)])
+
+    def test_removed_agents_do_not_block(self):
+        agents = swarm.Swarm([(1, 0), (0, 0)])
+        agents.remove(0)
+        on_target, positions = self.step(agents, (1, 0))
+        self.assertTrue(on_target)
+        self.assertEqual(positions[1], (1, 0))
@@ -0,0 +1,54 @@
+import unittest
+
+from yape.text import TextLayout
+
+
+class FakeFont(object):
+    """A font where every character is 10 pixels wide, counting measures"""
+
+    def __init__(self):
+        self.measured = 0
+
+    def size(self, text):
+        self.measured += 1
+        return (len(text) * 10, 20)
+
+    def get_linesize(self):
+        return 20
+
+
+class TextLayoutTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.font = FakeFont()
+
+    def test_wrap(self):
+        layout = TextLayout()
+        self.assertEqual(
+            layout.wrap('the quick brown fox', self.font, 100),
+            ('the quick', 'brown fox')
+        )
+
+    def test_hyphenate(self):
+        layout = TextLayout()
+        self.assertEqual(
+            layout.wrap('abcdefghij', self.font, 50),
+            ('abcd-', 'efgh-', 'ij')
+        )
+
+    def test_layout_keeps_blank_lines(self):
+        layout = TextLayout()
+        self.assertEqual(
+            layout.layout(['one', '', 'two'], self.font, 100),
+            ('one', '', 'two')
+        )
+
+    def test_widths_are_bounded(self):
+        layout = TextLayout(width_cache_size=2)
+        for word in ('a', 'bb', 'ccc'):
+            layout.measure(self.font, word)
+        self.assertEqual(len(layout.widths.data), 2)
+        self.assertEqual(layout.measure(self.font, 'ccc'), 30)
+        self.assertEqual(self.font.measured, 3)
+        self.assertEqual(layout.measure(self.font, 'a'), 10)
+        self.assertEqual(self.font.measured, 4)
@@ -0,0 +1,73 @@
+import unittest
+
+from yape.timers import Scheduler
+
+
+class SchedulerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = Scheduler()
+        self.calls = []
+
+    def record(self, name, *args):
+        self.calls.append((name,) + args)
+
+    def test_call_every(self):
+        self.scheduler.call_every(100, self.record, 'tick')
+        for now in (50, 100, 150, 200, 300):
+            self.scheduler.run(now, now)
+        self.assertEqual(
+            self.calls, [('tick', 100), ('tick', 200), ('tick', 300)]
+        )
+
+    def test_order_due_then_registered(self):
+        self.scheduler.call_every(100, self.record, 'every')
+        self.scheduler.call_at(100, self.record, 'second')
+        self.scheduler.call_at(50, self.record, 'first')
+        self.scheduler.call_at(100, self.record, 'third')
+        self.scheduler.run(100)
+        self.assertEqual(
+            self.calls, [('first',), ('every',), ('second',), ('third',)]
+        )
+
+    def test_cancel(self):
+        timer = self.scheduler.call_every(100, self.record, 'tick')
+        self.scheduler.run(100)
+        self.scheduler.cancel(timer)
+        self.scheduler.run(200)
+        self.assertEqual(self.calls, [('tick',)])
+        self.assertEqual(self.scheduler.timers(), [])
+
+    def test_cancel_while_due(self):
+        # A timer cancelled by a callback that runs before it in the same
+        # run does not run
+        later = self.scheduler.call_at(100, self.record, 'later')
+        self.scheduler.call_at(
+            50, lambda: self.scheduler.cancel(later)
+        )
+        self.scheduler.run(100)
+        self.assertEqual(self.calls, [])
+
+    def test_rearm(self):
+        # Cancelling a repeating timer and registering it again starts the
+        # interval over from now, as when the joystick changes direction
+        timer = self.scheduler.call_every(100, self.record, 'left')
+        self.scheduler.run(150)
+        self.scheduler.cancel(timer)
+        self.scheduler.call_every(100, self.record, 'right')
+        for now in (200, 250, 350):
+            self.scheduler.run(now, now)
+        self.assertEqual(
+            self.calls, [('left',), ('right', 250), ('right', 350)]
+        )
+
+    def test_fallen_behind_runs_once(self):
+        self.scheduler.call_every(100, self.record, 'tick')
+        self.scheduler.run(100, 100)
+        # Paused for a while
+        self.scheduler.run(1050, 1050)
+        self.scheduler.run(1100, 1100)
+        self.scheduler.run(1150, 1150)
+        self.assertEqual(
+            self.calls, [('tick', 100), ('tick', 1050), ('tick', 1150)]
+        )
@@ -0,0 +1,35 @@
+def pack(sizes, width=1024, height=1024):
+    """
+    Packs rectangles of the given (width, height) `sizes` onto as few sheets
+    of at most `width` by `height` as a simple shelf packer manages. The
+    rectangles are placed tallest first, left to right in rows, or shelves,
+    as tall as the first rectangle placed on them.
+
+    Returns a two-tuple. The first is a list with a (sheet, x, y) tuple for
+    each size in the order given, or None for sizes that do not fit on a
+    sheet. The second is a list of the (width, height) used on each sheet.
+    """
+    order = sorted(
+        range(len(sizes)), key=lambda index: (-sizes[index][1], -sizes[index][0])
+    )
+    placements = [None] * len(sizes)
+    sheets = []
+    x = y = shelf_height = 0
+    for index in order:
+        rect_width, rect_height = sizes[index]
+        if rect_width > width or rect_height > height:
+            continue
+        if sheets and x + rect_width > width:
+            # Start a new shelf below the current one
+            x, y = 0, y + shelf_height
+            shelf_height = 0
+        if not sheets or y + rect_height > height:
+            sheets.append((0, 0))
+            x = y = shelf_height = 0
+        sheet = len(sheets) - 1
+        placements[index] = (sheet, x, y)
+        x += rect_width
+        shelf_height = max(shelf_height, rect_height)
+        used_width, used_height = sheets[sheet]
+        sheets[sheet] = (max(used_width, x), max(used_height, y + rect_height))
+    return placements, sheets
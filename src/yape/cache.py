@@ -0,0 +1,99 @@
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """
+    A mapping that holds at most `maxsize` items. When full, the least
+    recently used item is evicted to make room for a new one. Keeps count of
+    cache hits, misses and evictions for inspection.
+
+    If `max_bytes` is given, items are also evicted while the total size of
+    the items is over `max_bytes`, where the size of each item is given by
+    the `sizeof` function. The most recently added item is never evicted, so
+    an item larger than the budget is still held. A `maxsize` of None only
+    limits the cache by size.
+    """
+
+    def __init__(self, maxsize=128, max_bytes=None, sizeof=None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.data = OrderedDict()
+        self.sizes = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __getitem__(self, key):
+        try:
+            value = self.data.pop(key)
+        except KeyError:
+            self.misses += 1
+            raise
+        # Re-insert the value to mark it as the most recently used
+        self.data[key] = value
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        self.pop(key)
+        self.data[key] = value
+        if self.sizeof is not None:
+            size = self.sizes[key] = self.sizeof(value)
+            self.bytes += size
+        self._evict()
+
+    def _evict_oldest(self):
+        key, value = self.data.popitem(last=False)
+        self.bytes -= self.sizes.pop(key, 0)
+        self.evictions += 1
+
+    def _evict(self):
+        while self.maxsize is not None and len(self.data) > self.maxsize:
+            self._evict_oldest()
+        while self.max_bytes is not None and self.bytes > self.max_bytes:
+            if len(self.data) <= 1:
+                break
+            self._evict_oldest()
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, default=None):
+        self.bytes -= self.sizes.pop(key, 0)
+        return self.data.pop(key, default)
+
+    def resize(self, maxsize=None, max_bytes=None):
+        """Changes the limits of the cache, evicting items to fit them"""
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def clear(self):
+        self.data.clear()
+        self.sizes.clear()
+        self.bytes = 0
+
+    def stats(self):
+        """
+        Returns a dictionary of the cache's size, hits, misses and evictions
+        """
+        return {
+            'size': len(self.data),
+            'maxsize': self.maxsize,
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
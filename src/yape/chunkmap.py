@@ -0,0 +1,219 @@
+"""
+A binary map format that stores a grid of cells in square chunks, so that
+very large maps can be memory-mapped and read one chunk at a time.
+
+A file begins with a header of the magic string, the format version, the
+chunk size, the width and height in cells and the number of cells flagged
+as spawn cells. The header is followed by the spawn index, a table of the
+row-major index of each spawn cell in ascending order, and then by each
+chunk in row-major order. A chunk holds a byte of tile id for each of its
+cells, followed by a byte of flags (SOLID, SPAWN) for each of its cells, both
+in row-major order. Chunks along the right and bottom edges are padded to
+the full chunk size.
+"""
+
+import mmap
+import struct
+
+from yape.cache import LRUCache
+
+
+MAGIC = 'RZMAP'
+VERSION = 2
+HEADER = struct.Struct('<5sBHIII')
+# An entry of the spawn index
+SPAWN_INDEX = struct.Struct('<I')
+
+# Cell flags
+SOLID = 1
+SPAWN = 2
+
+# Translates a byte of cell flags to 1 for solid cells and 0 for the rest
+SOLID_TABLE = ''.join(chr(1 if flags & SOLID else 0) for flags in xrange(256))
+
+
+def write_chunked_map(path, tiles, flags, width, height, chunk_size=16):
+    """
+    Writes a chunked map file to `path`, given the `tiles` and `flags` of a
+    grid `width` by `height` cells in row-major order. Tile ids must be less
+    than 256.
+    """
+    spawn_indexes = [
+        index for index, cell_flags in enumerate(flags) if cell_flags & SPAWN
+    ]
+    chunks_x = (width + chunk_size - 1) // chunk_size
+    chunks_y = (height + chunk_size - 1) // chunk_size
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(
+            MAGIC, VERSION, chunk_size, width, height, len(spawn_indexes)
+        ))
+        for index in spawn_indexes:
+            f.write(SPAWN_INDEX.pack(index))
+        for chunk_y in xrange(chunks_y):
+            for chunk_x in xrange(chunks_x):
+                chunk_tiles = bytearray(chunk_size * chunk_size)
+                chunk_flags = bytearray(chunk_size * chunk_size)
+                left = chunk_x * chunk_size
+                columns = min(chunk_size, width - left)
+                for row in xrange(min(chunk_size, height - chunk_y * chunk_size)):
+                    start = (chunk_y * chunk_size + row) * width + left
+                    offset = row * chunk_size
+                    chunk_tiles[offset:offset + columns] = bytearray(
+                        tiles[start:start + columns]
+                    )
+                    chunk_flags[offset:offset + columns] = bytearray(
+                        flags[start:start + columns]
+                    )
+                f.write(chunk_tiles)
+                f.write(chunk_flags)
+
+
+class ChunkedPlane(object):
+    """
+    A read-only sequence of one value for each cell of a ChunkedGrid, such as
+    its tiles, indexed in row-major order like an in-memory grid buffer.
+    """
+
+    def __init__(self, size, get_value):
+        self.size = size
+        self.get_value = get_value
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [
+                self.get_value(i) for i in xrange(*index.indices(self.size))
+            ]
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError('cell index out of range')
+        return self.get_value(index)
+
+
+class ChunkedGrid(object):
+    """
+    A grid of cells read from a chunked map file through `mmap`. Chunks are
+    only read when one of their cells is accessed, and at most `cache_size`
+    chunks are kept in memory, evicting the least recently used. `tiles` and
+    `solids` are sequences of the grid's tile ids and solidity that may be
+    used in place of in-memory buffers.
+    """
+
+    def __init__(self, path, cache_size=64):
+        with open(path, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.mmap) < HEADER.size:
+            raise IOError('{0} is not a chunked map'.format(path))
+        (magic, version, self.chunk_size, self.width, self.height,
+            self.spawn_count) = HEADER.unpack_from(self.mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise IOError('{0} is not a version {1} chunked map'.format(
+                path, VERSION
+            ))
+        self.chunks_offset = HEADER.size + self.spawn_count * SPAWN_INDEX.size
+        self.chunks_x = (self.width + self.chunk_size - 1) // self.chunk_size
+        self.chunks = LRUCache(cache_size)
+        size = self.width * self.height
+        self.tiles = ChunkedPlane(size, self.get_tile)
+        self.solids = ChunkedPlane(size, self.is_solid)
+
+    def get_chunk(self, chunk_x, chunk_y):
+        """
+        Returns a (tiles, flags) two-tuple of bytearrays for the chunk, reading
+        it from the file if it is not in memory.
+        """
+        chunk = self.chunks.get((chunk_x, chunk_y))
+        if chunk is None:
+            area = self.chunk_size * self.chunk_size
+            chunk_index = chunk_y * self.chunks_x + chunk_x
+            offset = self.chunks_offset + chunk_index * area * 2
+            chunk = (
+                bytearray(self.mmap[offset:offset + area]),
+                bytearray(self.mmap[offset + area:offset + area * 2]),
+            )
+            self.chunks[(chunk_x, chunk_y)] = chunk
+        return chunk
+
+    def _locate(self, index):
+        x, y = index % self.width, index // self.width
+        size = self.chunk_size
+        chunk = self.get_chunk(x // size, y // size)
+        return chunk, (y % size) * size + x % size
+
+    def get_tile(self, index):
+        (tiles, flags), offset = self._locate(index)
+        return tiles[offset]
+
+    def get_flags(self, index):
+        (tiles, flags), offset = self._locate(index)
+        return flags[offset]
+
+    def is_solid(self, index):
+        return self.get_flags(index) & SOLID
+
+    def is_spawn(self, index):
+        return self.get_flags(index) & SPAWN
+
+    def read_solids(self):
+        """
+        Returns a bytearray of the solidity of every cell of the grid, in
+        row-major order. The flags of each chunk are read from the file
+        directly, rather than paging every chunk into memory.
+        """
+        size = self.chunk_size
+        area = size * size
+        solids = bytearray(self.width * self.height)
+        for chunk_y in xrange((self.height + size - 1) // size):
+            rows = min(size, self.height - chunk_y * size)
+            for chunk_x in xrange(self.chunks_x):
+                columns = min(size, self.width - chunk_x * size)
+                chunk_index = chunk_y * self.chunks_x + chunk_x
+                offset = self.chunks_offset + chunk_index * area * 2 + area
+                flags = self.mmap[offset:offset + area].translate(SOLID_TABLE)
+                for row in xrange(rows):
+                    start = (chunk_y * size + row) * self.width + chunk_x * size
+                    solids[start:start + columns] = (
+                        flags[row * size:row * size + columns]
+                    )
+        return solids
+
+    def retain(self, x, y, width, height, margin=1):
+        """
+        Evicts the chunks in memory that are further than `margin` chunks
+        from the rectangle at `x`, `y` with the given width and height.
+        """
+        size = self.chunk_size
+        left, top = x // size - margin, y // size - margin
+        right = (x + width - 1) // size + margin
+        bottom = (y + height - 1) // size + margin
+        for chunk_x, chunk_y in list(self.chunks.data):
+            if not (left <= chunk_x <= right and top <= chunk_y <= bottom):
+                self.chunks.pop((chunk_x, chunk_y))
+
+    def get_spawn_index(self, position):
+        """Returns the cell index at `position` in the spawn index"""
+        return SPAWN_INDEX.unpack_from(
+            self.mmap, HEADER.size + position * SPAWN_INDEX.size
+        )[0]
+
+    def sample_spawn_cells(self, count, rng):
+        """
+        Returns a list of `count` distinct (x, y) cells flagged as spawn cells,
+        picked at random from the spawn index, or every spawn cell if there
+        are not that many. Only the picked entries of the index are read, and
+        no chunks are paged in.
+        """
+        positions = rng.sample(
+            xrange(self.spawn_count), min(count, self.spawn_count)
+        )
+        found = []
+        for position in positions:
+            index = self.get_spawn_index(position)
+            found.append((index % self.width, index // self.width))
+        return found
+
+    def close(self):
+        self.mmap.close()
@@ -0,0 +1,71 @@
+try:
+    import pygame
+except ImportError:
+    # Games run without a display, such as simulations, pass in `get_ticks`
+    # and never call tick
+    pygame = None
+
+from yape.timers import Scheduler
+
+
+class Clock(object):
+    """
+    A fixed timestep scheduler for the game loop. Game logic is run in steps
+    of `timestep` milliseconds, independent of how often frames are rendered,
+    while rendering is capped at `fps` frames per second. When a frame runs
+    late, the logic steps that are due are run to catch up, up to `max_steps`
+    per frame. `ticks` is the game time in milliseconds, advanced by one
+    timestep for each logic step. Takes an optional `get_ticks` function that
+    returns the current time in milliseconds. `timers` is a Scheduler for
+    callbacks that run in game time.
+    """
+
+    def __init__(self, fps=30, timestep=None, max_steps=5, get_ticks=None):
+        self.fps = fps
+        self.timestep = timestep or 1000 // (fps or 30)
+        self.max_steps = max_steps
+        self.get_ticks = get_ticks or pygame.time.get_ticks
+        self.ticks = 0
+        self.timers = Scheduler()
+        self._clock = pygame.time.Clock() if pygame else None
+        self.reset()
+
+    def reset(self):
+        """
+        Discards any time elapsed since the last call to steps, such as time
+        spent waiting for events, so that it is not caught up on later.
+        """
+        self._last = None
+        self._lag = 0
+
+    def steps(self):
+        """
+        Returns the number of logic steps that are due since the last call.
+        """
+        now = self.get_ticks()
+        if self._last is None:
+            self._last = now
+        self._lag += now - self._last
+        self._last = now
+        steps = self._lag // self.timestep
+        if steps > self.max_steps:
+            # Too far behind to catch up, so drop the excess time
+            steps = self.max_steps
+            self._lag = 0
+        else:
+            self._lag -= steps * self.timestep
+        return steps
+
+    def advance(self):
+        """Advances the game time by one logic step"""
+        self.ticks += self.timestep
+
+    def tick(self):
+        """
+        Waits as long as needed to keep the frame rate at or below `fps`. Should
+        be called once per frame.
+        """
+        return self._clock.tick(self.fps)
+
+    def get_fps(self):
+        return self._clock.get_fps()
@@ -58,11 +58,14 @@ class BaseComponent(object):
                 asset_args = getattr(self, asset_field_name, None)
                 if asset_args is not None:
                     # If the field is a dictionary, load assets for its values and
-                    # assign them to the keys of the dictionary
+                    # assign them to the keys of a new dictionary, leaving the
+                    # data, which may be cached by the manager, unchanged
                     if isinstance(asset_args, dict):
+                        asset_refs = {}
                         for key, value in asset_args.items():
                             asset_ref = self._get_asset_ref(field_type, manager_method, asset_field_name, value)
-                            asset_args[key] = asset_ref
+                            asset_refs[key] = asset_ref
+                        setattr(self, asset_field_name, asset_refs)
                     else:
                         asset_ref = self._get_asset_ref(field_type, manager_method, asset_field_name, asset_args)
                         setattr(self, asset_field_name, asset_ref)
@@ -150,11 +153,24 @@ class LoadableComponent(BaseComponent):
 
     def __init__(self, manager, location=None):
         super(LoadableComponent, self).__init__(manager)
-        location = location or getattr(self, 'location', None)
-        if location:
-            self.load_location(location)
+        self.location = location or getattr(self, 'location', None)
+        if self.location:
+            self._load_from_location()
+
+    def _load_from_location(self):
+        # Record the files used while loading, so that the component is
+        # reloaded when they change
+        with self.manager.track(self):
+            self.load_location(self.location)
             self.load(self.raw_data)
 
+    def reload(self):
+        """
+        Loads the component's data from its location again, after which
+        the component is processed as it was when first loaded.
+        """
+        self._load_from_location()
+
     def load_location(self, location):
         """
         Attempt to load data from the given location.
@@ -1,6 +1,21 @@
 import pygame
 
 
+class PygameEventSource(object):
+    """
+    The default source of events for a Dispatch, which reads events from the
+    pygame event queue.
+    """
+
+    def get(self):
+        return pygame.event.get()
+
+    def wait(self):
+        events = [pygame.event.wait()]
+        events.extend(pygame.event.get())
+        return events
+
+
 class Dispatch(object):
     """
     An event dispatcher that registers event listeners and dispatchs events to
@@ -8,6 +23,11 @@ class Dispatch(object):
     """
 
     listeners = {}
+    # States in which nothing changes until an event occurs
+    static_states = set()
+    # Provides events to handle_events and wait_events. May be replaced with
+    # any object that has `get` and `wait` methods, such as an EventPlayer
+    event_source = PygameEventSource()
 
     def register(self, state, listener, event_type=None):
         """
@@ -25,7 +45,15 @@ class Dispatch(object):
         Given the `game_data` and any args/kwargs, dispatch pygame events to
         the registered listeners for the current state based on the event_type
         """
-        for event in pygame.event.get():
+        for event in self.event_source.get():
+            self.dispatch(event, game_data, *args, **kwargs)
+
+    def wait_events(self, game_data, *args, **kwargs):
+        """
+        The same as handle_events, except that it blocks until at least one
+        event occurs rather than returning immediately if there are none.
+        """
+        for event in self.event_source.wait():
             self.dispatch(event, game_data, *args, **kwargs)
 
     def dispatch(self, event, game_data, *args, **kwargs):
@@ -39,6 +67,18 @@ class Dispatch(object):
         for listener in listeners:
             listener(event, game_data, *args, **kwargs)
 
+    def register_static_states(self, states):
+        """
+        Given a list of state strings, marks those states as static, meaning
+        the display does not change while in them until an event occurs. The
+        game loop can wait for events in these states instead of polling.
+        """
+        self.static_states.update(states)
+
+    def is_static(self, state):
+        """Checks if the given `state` was registered as static"""
+        return state in self.static_states
+
     def register_listener(self, states, event_type=None):
         """
         Decorator that registers a listener. Takes a list of state strings to
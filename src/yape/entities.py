@@ -0,0 +1,124 @@
+class EntityRegistry(object):
+    """
+    Tracks entities by a unique key and by their (x, y) position on a grid.
+    Keys are (kind, id) tuples, such as ('item', 3), so that entities of
+    different kinds may share ids and lookups may be limited to one kind.
+
+    Positions are indexed by exact coordinate and by square buckets of
+    `bucket_size` tiles, so that looking up the entities at a coordinate or
+    within a rectangle takes time proportional to the number of entities
+    found rather than the number of entities registered.
+    """
+
+    def __init__(self, bucket_size=8):
+        self.bucket_size = bucket_size
+        self.entities = {}
+        self.positions = {}
+        self.cells = {}
+        self.buckets = {}
+
+    def __len__(self):
+        return len(self.entities)
+
+    def __contains__(self, key):
+        return key in self.entities
+
+    def _get_bucket(self, position):
+        x, y = position
+        return x // self.bucket_size, y // self.bucket_size
+
+    def _place(self, key, position):
+        self.positions[key] = position
+        self.cells.setdefault(position, set()).add(key)
+        self.buckets.setdefault(self._get_bucket(position), set()).add(key)
+
+    def _unplace(self, key):
+        position = self.positions.pop(key)
+        for index, index_key in (
+                (self.cells, position),
+                (self.buckets, self._get_bucket(position))):
+            keys = index[index_key]
+            keys.discard(key)
+            if not keys:
+                del index[index_key]
+
+    def add(self, key, entity, position):
+        """
+        Registers the `entity` with the given `key` at `position`, replacing
+        any entity already registered with that key.
+        """
+        if key in self.entities:
+            self._unplace(key)
+        self.entities[key] = entity
+        self._place(key, position)
+
+    def remove(self, key):
+        """Unregisters and returns the entity with the given `key`"""
+        entity = self.entities.pop(key)
+        self._unplace(key)
+        return entity
+
+    def move(self, key, position):
+        """Moves the entity with the given `key` to `position`"""
+        if self.positions[key] != position:
+            self._unplace(key)
+            self._place(key, position)
+
+    def clear(self, kind=None):
+        """
+        Unregisters all entities of the given `kind`, or every entity if no
+        kind is given.
+        """
+        if kind is None:
+            keys = list(self.entities)
+        else:
+            keys = [key for key in self.entities if key[0] == kind]
+        for key in keys:
+            self.remove(key)
+
+    def get(self, key, default=None):
+        return self.entities.get(key, default)
+
+    def get_position(self, key):
+        return self.positions[key]
+
+    def at(self, position, kind=None):
+        """
+        Returns a list of the entities at `position`, limited to the given
+        `kind` if provided.
+        """
+        return [
+            self.entities[key]
+            for key in self.cells.get(position, ())
+            if kind is None or key[0] == kind
+        ]
+
+    def has(self, position, kind=None):
+        """
+        Checks if any entity, or any entity of the given `kind`, is at
+        `position`.
+        """
+        for key in self.cells.get(position, ()):
+            if kind is None or key[0] == kind:
+                return True
+        return False
+
+    def in_rect(self, x, y, width, height, kind=None):
+        """
+        Yields an (entity, position) two-tuple for each entity within the
+        rectangle with its top left corner at `x`, `y` and with the given
+        `width` and `height` in tiles. Limited to the given `kind` if
+        provided.
+        """
+        left, top = self._get_bucket((x, y))
+        right, bottom = self._get_bucket((x + width - 1, y + height - 1))
+        for bucket_y in xrange(top, bottom + 1):
+            for bucket_x in xrange(left, right + 1):
+                for key in self.buckets.get((bucket_x, bucket_y), ()):
+                    if kind is not None and key[0] != kind:
+                        continue
+                    position = self.positions[key]
+                    position_x, position_y = position
+                    if (x <= position_x < x + width and
+                            y <= position_y < y + height):
+                        yield self.entities[key], position
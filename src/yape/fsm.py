@@ -27,6 +27,9 @@ class FSM(object):
     to the associated callback(s) for the transition. In the above example, a
     call to fms.enter(score=10), would pass the score=10 kwarg to the
     `on_enter` and `on_before_enter` for handling.
+
+    Functions added with add_observer are called with the source and
+    destination states after every transition, whatever its name.
     """
 
     # Tracks the set of possible states or "nodes" that the machine may enter
@@ -52,6 +55,7 @@ class FSM(object):
         # provided
         self.state = initial
         self.possible_states.add(initial)
+        self.observers = []
         callbacks = callbacks or {}
         transitions = transitions or []
         map(self.add_transition, transitions)
@@ -130,16 +134,30 @@ class FSM(object):
             if self.callbacks:
                 resume = self._call_callback(name, 'before', *args, **kwargs)
                 if resume:
-                    self.state = destination
+                    self._change_state(destination)
                     return self._call_callback(name, '', *args, **kwargs)
             else:
-                self.state = destination
+                self._change_state(destination)
         else:
             err_msg = '{0} called when current state was {1}'
             raise self.IllegalTransitionException(
                 err_msg.format(name, self.state)
             )
 
+    def add_observer(self, func):
+        """
+        Registers `func` to be called with the source and destination states
+        after every transition, such as to react to leaving a state however
+        it is left.
+        """
+        self.observers.append(func)
+
+    def _change_state(self, destination):
+        source = self.state
+        self.state = destination
+        for observer in self.observers:
+            observer(source, destination)
+
     def _call_callback(self, transition_name, prefix, *args, **kwargs):
         """Calls the callback on behalf of the transition function"""
         if prefix:
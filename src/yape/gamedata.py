@@ -0,0 +1,8 @@
+from collections import namedtuple
+
+
+# The objects that make up a running game. Kept apart from initialize, so
+# that games can be run without pygame, such as in simulations
+GameData = namedtuple('GameData',
+    ['state', 'dispatcher', 'screen', 'config', 'manager', 'clock']
+)
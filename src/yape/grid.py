@@ -0,0 +1,64 @@
+"""
+Helpers for grids of cells stored in compact, row-major buffers, such as the
+tiles of a map in an `array` and their solidity in a `bytearray`.
+"""
+
+from array import array
+from itertools import compress
+
+
+# Array typecodes from smallest to largest, with the largest value each holds
+_TYPECODES = [('B', 0xFF), ('H', 0xFFFF), ('L', 0xFFFFFFFF)]
+
+
+def pack(values):
+    """
+    Given a sequence of non-negative integers, returns them in an array with
+    the smallest typecode that can hold every value.
+    """
+    largest = max(values) if len(values) else 0
+    for typecode, maximum in _TYPECODES:
+        if largest <= maximum:
+            return array(typecode, values)
+    raise OverflowError('{0} is too large to pack'.format(largest))
+
+
+def mask(values, members):
+    """
+    Returns a bytearray with a 1 for each of the `values` that is one of
+    `members` and a 0 for every other value. Byte arrays are translated in C
+    rather than compared one value at a time.
+    """
+    if getattr(values, 'typecode', None) == 'B':
+        table = bytearray(256)
+        for member in members:
+            if 0 <= member < 256:
+                table[member] = 1
+        return bytearray(values.tostring()).translate(bytes(table))
+    members = set(members)
+    return bytearray(value in members for value in values)
+
+
+def invert(cell_mask):
+    """Returns a copy of a mask of 0s and 1s with each 0 and 1 swapped"""
+    table = bytearray(256)
+    table[0] = 1
+    return cell_mask.translate(bytes(table))
+
+
+def find(cell_mask):
+    """Returns a list of the indexes of the cells that are set in a mask"""
+    return list(compress(xrange(len(cell_mask)), cell_mask))
+
+
+def get_rect(values, width, x, y, rect_width, rect_height):
+    """
+    Returns a list of the rows of `values`, a grid `width` cells wide, within
+    the rectangle at `x`, `y` with the given width and height. Each row is a
+    slice of the same type as `values`.
+    """
+    rows = []
+    for row_y in xrange(y, y + rect_height):
+        start = row_y * width + x
+        rows.append(values[start:start + rect_width])
+    return rows
@@ -1,29 +1,51 @@
-from collections import namedtuple
-
 import pygame
 
+from yape.gamedata import GameData
 from yape.screen import Screen
 from yape.manager import Manager
+from yape.clock import Clock
 
 
-GameData = namedtuple('GameData',
-    ['state', 'dispatcher', 'screen', 'config', 'manager']
-)
-
-
-def initialize(game_state, dispatcher, ConfigClass, assets_path):
+def initialize(game_state, dispatcher, ConfigClass, assets_path,
+               manifest=None):
     """
     Initializes pygame, loads the configuration files and creates a display
     context. Returns a GameData namedtuple with the following members:
-        (game_state, dispatcher, screen, config, manager)
+        (game_state, dispatcher, screen, config, manager, clock)
+
+    If the filename of a `manifest` in the config directory is given, the
+    assets it lists are preloaded in parallel while a loading bar is shown
+    over the manifest's 'splash' image.
     """
     # Initialize pygame and pygame mixer
     pygame.init()
     pygame.mixer.init()
+    # The first joystick is used if one is plugged in
+    try:
+        pygame.joystick.Joystick(0).init()
+    except pygame.error:
+        pass
     manager = Manager(assets_path)
     # Create a screen to get a display context
     screen = Screen(manager)
+    if manifest is not None:
+        preload(screen, manager, manifest)
     # Load configuration file for various settings
     config = ConfigClass(manager)
-    return GameData(game_state, dispatcher, screen, config, manager)
+    # Create a clock for frame rate and logic timestep settings from the screen
+    clock = Clock(screen.fps, screen.timestep)
+    return GameData(game_state, dispatcher, screen, config, manager, clock)
+
+
+def preload(screen, manager, manifest):
+    manifest = manager.get_json('config', manifest)
+    if not manifest:
+        return
+    splash = manifest.get('splash')
+    if splash:
+        splash = manager.get_image(splash)
+
+    def progress(done, total):
+        screen.draw_progress(done, total, splash)
 
+    manager.preload(manifest, progress)
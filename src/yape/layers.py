@@ -0,0 +1,105 @@
+class TileLayer(object):
+    """
+    Pre-renders a grid of tiles into chunk surfaces so that a region of the
+    grid can be drawn with one blit per visible chunk, rather than one blit
+    per tile. `get_image` is called with an x and y tile coordinate and
+    returns the image for that tile, or a falsy value for an empty tile.
+    Chunks are rendered on first use and kept until they are invalidated.
+    """
+
+    def __init__(self, screen, width, height, get_image, chunk_size=16):
+        self.screen = screen
+        self.width = width
+        self.height = height
+        self.get_image = get_image
+        self.chunk_size = chunk_size
+        self.chunks = {}
+        # Incremented whenever the layer changes, so that callers can tell if
+        # something drawn from the layer is out of date
+        self.version = 0
+
+    def invalidate(self, x=None, y=None):
+        """
+        Drops the chunk containing the tile at `x`, `y` so that it is rendered
+        again on next use. Drops all chunks if no coordinates are given.
+        """
+        if x is None or y is None:
+            self.chunks.clear()
+        else:
+            size = self.chunk_size
+            self.chunks.pop((x // size, y // size), None)
+        self.version += 1
+
+    def retain(self, origin, size, margin=1):
+        """
+        Drops the rendered chunks that are further than `margin` chunks from
+        the region at the tile coordinates `origin` that spans `size` tiles.
+        """
+        chunk_size = self.chunk_size
+        (x, y), (columns, rows) = origin, size
+        left, top = x // chunk_size - margin, y // chunk_size - margin
+        right = (x + columns - 1) // chunk_size + margin
+        bottom = (y + rows - 1) // chunk_size + margin
+        for chunk_x, chunk_y in list(self.chunks):
+            if not (left <= chunk_x <= right and top <= chunk_y <= bottom):
+                del self.chunks[(chunk_x, chunk_y)]
+
+    def get_chunk(self, chunk_x, chunk_y):
+        try:
+            chunk = self.chunks[(chunk_x, chunk_y)]
+        except KeyError:
+            chunk = self._render_chunk(chunk_x, chunk_y)
+            self.chunks[(chunk_x, chunk_y)] = chunk
+        return chunk
+
+    def _render_chunk(self, chunk_x, chunk_y):
+        screen = self.screen
+        size = self.chunk_size
+        start_x, start_y = chunk_x * size, chunk_y * size
+        columns = min(size, self.width - start_x)
+        rows = min(size, self.height - start_y)
+        surface = screen.get_surface(
+            columns * screen.tile_width, rows * screen.tile_height
+        ).convert()
+        surface.fill(screen.get_color(screen.background_color))
+        get_image = self.get_image
+        for y in xrange(rows):
+            for x in xrange(columns):
+                image = get_image(start_x + x, start_y + y)
+                screen.draw_tile(image, (x, y), surface=surface)
+        return surface
+
+    def draw(self, origin, size, surface=None):
+        """
+        Draws the region of the grid that starts at the tile coordinates
+        `origin` and spans `size` (columns, rows) tiles. The region is drawn
+        with its top left corner at the top left corner of the surface.
+        """
+        screen = self.screen
+        tile_width, tile_height = screen.tile_width, screen.tile_height
+        chunk_size = self.chunk_size
+        origin_x, origin_y = origin
+        columns, rows = size
+        left, top = max(origin_x, 0), max(origin_y, 0)
+        right = min(origin_x + columns, self.width)
+        bottom = min(origin_y + rows, self.height)
+        if left >= right or top >= bottom:
+            return
+        for chunk_y in xrange(top // chunk_size, (bottom - 1) // chunk_size + 1):
+            for chunk_x in xrange(left // chunk_size, (right - 1) // chunk_size + 1):
+                chunk = self.get_chunk(chunk_x, chunk_y)
+                chunk_left, chunk_top = chunk_x * chunk_size, chunk_y * chunk_size
+                x0, y0 = max(left, chunk_left), max(top, chunk_top)
+                x1 = min(right, chunk_left + chunk_size)
+                y1 = min(bottom, chunk_top + chunk_size)
+                area = (
+                    (x0 - chunk_left) * tile_width,
+                    (y0 - chunk_top) * tile_height,
+                    (x1 - x0) * tile_width,
+                    (y1 - y0) * tile_height,
+                )
+                coordinates = (
+                    (x0 - origin_x) * tile_width,
+                    (y0 - origin_y) * tile_height,
+                )
+                screen.draw(chunk, coordinates, surface=surface, area=area)
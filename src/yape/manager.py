@@ -1,31 +1,163 @@
 import os
+import sys
 import json
-from weakref import WeakValueDictionary
+import threading
+from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
+from weakref import WeakValueDictionary, WeakSet
+
+try:
+    import pygame
+except ImportError:
+    # pygame is only needed to load images and fonts, which the
+    # HeadlessManager does not do
+    pygame = None
+
+from yape import atlas
+from yape import surfaces
+from yape.cache import LRUCache
+from yape.chunkmap import ChunkedGrid
+from yape.pixelcache import PixelCache
+from yape.records import JSONLinesFile
+
+# Errors that mean an asset could not be loaded
+LOAD_ERRORS = (IOError, pygame.error) if pygame else (IOError,)
+
+
+def estimate_size(asset):
+    """
+    Returns an estimate of the bytes of memory used by `asset`. Surfaces are
+    estimated from their size and bytes per pixel, except for subsurfaces,
+    such as sprites, whose pixels belong to their parent.
+    """
+    if hasattr(asset, 'get_bytesize'):
+        if asset.get_parent() is not None:
+            return sys.getsizeof(asset)
+        width, height = asset.get_size()
+        return width * height * asset.get_bytesize()
+    nbytes = getattr(asset, 'nbytes', None)
+    if nbytes is not None:
+        return nbytes
+    return sys.getsizeof(asset)
+
 
-import pygame
+def get_mtime(filename):
+    """Returns the modification time of a file, or None if it is missing"""
+    try:
+        return os.path.getmtime(filename)
+    except OSError:
+        return None
 
 
 class GenericAssetManager(object):
+    """
+    Loads assets of one type and caches them by the arguments they were
+    loaded with. Assets in use are kept unique by weak references, while
+    `lru`, an LRUCache that may be shared with other managers, holds strong
+    references to recently used assets so that they are not loaded again as
+    soon as they are no longer in use. The modification time of the file of
+    each asset is kept, so that assets whose files change can be reloaded.
+    """
 
-    def __init__(self, path):
+    def __init__(self, path, lru=None, lock=None):
         self.path = path
         self.cache = WeakValueDictionary()
+        self.lru = lru if lru is not None else LRUCache(maxsize=None)
+        self.mtimes = {}
+        # Assets may be loaded from worker threads, such as when preloading
+        # levels. The lock is only held while the caches are looked up or
+        # changed, and files are read and decoded outside it, so a slow load
+        # on one thread does not hold up lookups on the others
+        self.lock = lock or threading.RLock()
+
+    def get_filename(self, *args):
+        """Returns the filename of the asset loaded with `args`"""
+        return os.path.join(self.path, args[0])
+
+    def decode(self, *args):
+        """
+        Reads and decodes an asset. This is the part of loading that may be
+        done on another thread. By default, the whole asset is loaded.
+        """
+        return self.load(*args)
+
+    def finish(self, asset, *args):
+        """
+        Finishes loading an asset returned by decode for `args`, on the main
+        thread. By default, returns the asset as it is.
+        """
+        return asset
+
+    def safe_decode(self, *args):
+        """Returns the decoded asset, or None if it could not be loaded"""
+        try:
+            return self.decode(*args)
+        except LOAD_ERRORS:
+            print "Error loading {0}".format(args)
+            return None
+
+    def put(self, args, asset):
+        """Caches an `asset` loaded with `args` as if loaded by get"""
+        if asset is not None:
+            with self.lock:
+                self.cache[args] = asset
+                self.lru[(self, args)] = asset
+                filename = self.get_filename(*args)
+                self.mtimes[args] = (filename, get_mtime(filename))
+
+    def forget_changed(self):
+        """
+        Drops the cached assets whose files changed since they were loaded,
+        so that they are loaded again when next used. Returns a list of the
+        filenames that changed.
+        """
+        changed = []
+        with self.lock:
+            for args, (filename, mtime) in self.mtimes.items():
+                if get_mtime(filename) != mtime:
+                    del self.mtimes[args]
+                    self.cache.pop(args, None)
+                    self.lru.pop((self, args))
+                    changed.append(filename)
+        return changed
+
+    def _lookup(self, args):
+        """
+        Returns the cached asset loaded with `args`, marking it as recently
+        used, or None if it is not loaded. Must be called with the lock held.
+        """
+        key = (self, args)
+        try:
+            return self.lru[key]
+        except KeyError:
+            pass
+        # The asset may have been evicted while still in use
+        asset = self.cache.get(args)
+        if asset is not None:
+            self.lru[key] = asset
+        return asset
 
     def _load_asset(self, *args):
         try:
             asset = self.load(*args)
-        except (IOError, pygame.error):
-            asset = None
+        except LOAD_ERRORS:
             print "Error loading {0}".format(args)
-        else:
-            if asset is not None:
-                self.cache[args] = asset
+            return None
+        if asset is None:
+            return None
+        with self.lock:
+            # Another thread may have loaded the same asset in the meantime,
+            # and its copy is kept so that the asset stays unique
+            cached = self._lookup(args)
+            if cached is not None:
+                return cached
+            self.put(args, asset)
         return asset
 
     def get(self, *args):
-        try:
-            asset = self.cache[args]
-        except KeyError:
+        with self.lock:
+            asset = self._lookup(args)
+        if asset is None:
             asset = self._load_asset(*args)
         return asset
 
@@ -38,17 +170,55 @@ class FontManager(GenericAssetManager):
 
 
 class ImageManager(GenericAssetManager):
+    """
+    Loads images and converts them for the display by their transparency,
+    with a mode from yape.surfaces. Opaque images are converted without
+    alpha, images with only fully transparent and fully opaque pixels use a
+    colorkey, and only images with partly transparent pixels keep per-pixel
+    alpha.
+    """
 
-    def load(self, name):
+    # A PixelCache of decoded images, so that image files are only decoded
+    # the first time they are loaded
+    pixel_cache = None
+
+    def __init__(self, path, lru=None, lock=None):
+        super(ImageManager, self).__init__(path, lru, lock)
+        # Modes given for images by filename, in place of the mode chosen by
+        # their transparency
+        self.mode_overrides = {}
+        # The mode each image was converted with, by filename
+        self.modes = {}
+
+    def decode(self, name):
         filename = os.path.join(self.path, name)
-        return pygame.image.load(filename).convert_alpha()
+        if self.pixel_cache is not None:
+            image = self.pixel_cache.load(filename)
+            if image is not None:
+                return image
+        image = pygame.image.load(filename)
+        if self.pixel_cache is not None:
+            self.pixel_cache.save(filename, image)
+        return image
+
+    def finish(self, image, name):
+        # Converting to the display's pixel format needs the display, so it is
+        # only done on the main thread
+        if image is None:
+            return None
+        mode = self.mode_overrides.get(name) or surfaces.classify(image)
+        self.modes[name] = mode
+        return surfaces.convert(image, mode)
+
+    def load(self, name):
+        return self.finish(self.decode(name), name)
 
 
 class SpriteManager(GenericAssetManager):
 
-    def __init__(self, path):
-        super(SpriteManager, self).__init__(path)
-        self.image_manager = ImageManager(path)
+    def __init__(self, path, lru=None, lock=None):
+        super(SpriteManager, self).__init__(path, lru, lock)
+        self.image_manager = ImageManager(path, self.lru, self.lock)
 
     def _get_raw_image(self, name):
         return self.image_manager.get(name)
@@ -69,6 +239,13 @@ class SpriteManager(GenericAssetManager):
         return image
 
 
+class ChunkedMapManager(GenericAssetManager):
+
+    def load(self, name):
+        filename = os.path.join(self.path, name)
+        return ChunkedGrid(filename)
+
+
 class JSONDict(dict):
     """A dictionary for storing JSON data that can be weak referenced"""
 
@@ -85,40 +262,280 @@ class JSONList(list):
 
 class JSONManager(GenericAssetManager):
 
+    def get_filename(self, sub_path, name):
+        return os.path.join(self.path, sub_path, name)
+
     def load(self, sub_path, name):
-        filename = os.path.join(self.path, sub_path, name)
-        f = open(filename)
+        filename = self.get_filename(sub_path, name)
+        with open(filename) as f:
+            text = f.read()
         try:
-            json_data = json.loads(f.read())
+            json_data = json.loads(text)
         except ValueError as e:
             print 'Invalid JSON in file {0}. {1}'.format(filename, e)
             return None
         kls = JSONDict if isinstance(json_data, dict) else JSONList
-        return kls(json_data)
+        json_data = kls(json_data)
+        # Roughly the memory used by the data, for the asset cache's budget
+        json_data.nbytes = len(text) * 4
+        return json_data
+
+
+class JSONLinesManager(GenericAssetManager):
+
+    def get_filename(self, sub_path, name):
+        return os.path.join(self.path, sub_path, name)
+
+    def load(self, sub_path, name):
+        return JSONLinesFile(self.get_filename(sub_path, name))
+
+
+def _decode_job(job):
+    manager, args = job
+    return manager, args, manager.safe_decode(*args)
 
 
 class Manager(object):
     """
     Client class for obtaining and cacheing unique references to assets from
     the filesystem. Uses weak references to hold a unique object in memory
-    while used and free it once it is no longer in use.
+    while used, and keeps the most recently used assets in memory once they
+    are no longer in use, up to `cache_budget` bytes. Assets are then freed,
+    least recently used first.
     """
 
-    def __init__(self, assets_dir):
+    # The bytes of memory that unused assets may take up, which may be
+    # changed with set_cache_budget
+    cache_budget = 32 * 1024 * 1024
+    # The directory within the assets directory for the decoded pixels of
+    # images, or None to decode images every time they are loaded
+    pixel_cache_dir = 'cache'
+    # The largest size of an atlas surface, and of an image put on one
+    atlas_size = 1024
+    atlas_max_image = 128
+
+    # Whether assets that need a display, such as images, are loaded
+    headless = False
+
+    def __init__(self, assets_dir, cache_budget=None):
         self.path = assets_dir
         images_dir = os.path.join(assets_dir, 'images')
         fonts_dir = os.path.join(assets_dir, 'fonts')
-        self.json_manager = JSONManager(assets_dir)
-        self.image_manager = ImageManager(images_dir)
-        self.sprite_manager = SpriteManager(images_dir)
-        self.font_manager = FontManager(fonts_dir)
+        maps_dir = os.path.join(assets_dir, 'maps')
+        if cache_budget is not None:
+            self.cache_budget = cache_budget
+        # Every type of asset shares one cache, budget and lock
+        self.cache = LRUCache(
+            maxsize=None, max_bytes=self.cache_budget, sizeof=estimate_size
+        )
+        lock = threading.RLock()
+        self.json_manager = JSONManager(assets_dir, self.cache, lock)
+        self.json_lines_manager = JSONLinesManager(assets_dir, self.cache, lock)
+        self.chunked_map_manager = ChunkedMapManager(maps_dir, self.cache, lock)
+        self.image_manager = ImageManager(images_dir, self.cache, lock)
+        self.sprite_manager = SpriteManager(images_dir, self.cache, lock)
+        # Sprites are cut from the same images, preloaded or not
+        self.sprite_manager.image_manager = self.image_manager
+        if self.pixel_cache_dir is not None:
+            self.image_manager.pixel_cache = PixelCache(
+                os.path.join(assets_dir, self.pixel_cache_dir)
+            )
+        self.font_manager = FontManager(fonts_dir, self.cache, lock)
+        self.lock = lock
+        # The components that used each file, by filename
+        self.dependents = {}
+        self._loading = threading.local()
+
+    def _get_managers(self):
+        return [
+            self.json_manager, self.json_lines_manager,
+            self.chunked_map_manager, self.image_manager,
+            self.sprite_manager, self.font_manager,
+        ]
+
+    @contextmanager
+    def track(self, component):
+        """
+        A context manager that records the files of the assets used within
+        the block as dependencies of `component`, as well as of any component
+        being loaded around it. Components that depend on a file are reloaded
+        by reload when it changes.
+        """
+        stack = self._loading.__dict__.setdefault('stack', [])
+        stack.append(component)
+        try:
+            yield
+        finally:
+            stack.pop()
+
+    def _record(self, manager, args):
+        stack = getattr(self._loading, 'stack', None)
+        if stack:
+            filename = manager.get_filename(*args)
+            with self.lock:
+                dependents = self.dependents.setdefault(filename, WeakSet())
+                dependents.update(stack)
+
+    def reload(self):
+        """
+        Drops the assets whose files changed since they were loaded, and
+        reloads the components that used them. Returns a list of the reloaded
+        components.
+        """
+        components = set()
+        with self.lock:
+            for manager in self._get_managers():
+                for filename in manager.forget_changed():
+                    components.update(self.dependents.pop(filename, ()))
+        for component in components:
+            component.reload()
+        return list(components)
+
+    def set_cache_budget(self, cache_budget):
+        """
+        Changes the bytes of memory that unused assets may take up, freeing
+        assets to fit
+        """
+        with self.lock:
+            self.cache_budget = cache_budget
+            self.cache.resize(None, cache_budget)
+
+    def build_atlas(self, names):
+        """
+        Packs the images with the given filenames onto one or a few atlas
+        surfaces. From then on get_image returns subsurfaces of the atlases
+        for them, so images that are drawn together, such as a level's tiles,
+        share a surface. Images are only packed with images converted with
+        the same mode, so each atlas keeps the fastest way of drawing its
+        images. Images already on an atlas and images larger than
+        `atlas_max_image` are left as they are.
+        """
+        if self.headless:
+            return
+        with self.lock:
+            groups = {}
+            for name in sorted(set(names)):
+                image = self.get_image(name)
+                if image is None or image.get_parent() is not None:
+                    continue
+                width, height = image.get_size()
+                if max(width, height) <= self.atlas_max_image:
+                    mode = self.image_manager.modes.get(name, surfaces.ALPHA)
+                    groups.setdefault(mode, []).append((name, image))
+            for mode, images in sorted(groups.items()):
+                if len(images) < 2:
+                    continue
+                placements, sheet_sizes = atlas.pack(
+                    [image.get_size() for name, image in images],
+                    self.atlas_size, self.atlas_size
+                )
+                sheets = [
+                    surfaces.create_sheet(size, mode) for size in sheet_sizes
+                ]
+                for (name, image), (sheet, x, y) in zip(images, placements):
+                    subsurface = surfaces.copy_to_sheet(
+                        sheets[sheet], image, (x, y), mode
+                    )
+                    self.image_manager.put((name,), subsurface)
+
+    def decode_images(self, names):
+        """
+        Reads and decodes the images with the given filenames that are not
+        already loaded. This may be done on another thread. Returns a
+        dictionary of the decoded images by filename, which are converted and
+        cached by passing it to finish_images on the main thread.
+        """
+        if self.headless:
+            return {}
+        with self.lock:
+            names = [
+                name for name in set(names)
+                if self.image_manager.cache.get((name,)) is None
+            ]
+        return dict(
+            (name, self.image_manager.safe_decode(name)) for name in names
+        )
+
+    def finish_images(self, decoded):
+        """Converts and caches the images returned by decode_images"""
+        for name, image in decoded.items():
+            self.image_manager.put(
+                (name,), self.image_manager.finish(image, name)
+            )
+
+    def set_image_modes(self, modes):
+        """
+        Sets the modes from yape.surfaces that the images with the given
+        filenames are converted with, in place of the mode chosen by their
+        transparency, for images loaded from then on. `modes` is a dictionary
+        of modes by filename.
+        """
+        for name, mode in modes.items():
+            if mode not in surfaces.MODES:
+                print 'Unknown image mode {0} for {1}'.format(mode, name)
+                continue
+            self.image_manager.mode_overrides[name] = mode
+
+    def preload(self, manifest, progress=None, workers=4):
+        """
+        Loads the assets listed in `manifest` so that they are cached before
+        they are used. `manifest` is a dictionary that may have a list of
+        [sub_path, filename] pairs under 'json', of filenames under 'images'
+        and of [filename, size] pairs under 'fonts'. It may also have a
+        dictionary of image modes by filename under 'modes', which is passed
+        to set_image_modes.
+
+        Files are read and decoded on a pool of `workers` threads, while the
+        calling thread converts images for the display, as pygame requires.
+        `progress` is called with the number of assets loaded so far and the
+        total number after each asset, such as to draw a loading bar.
+        """
+        jobs = [
+            (self.json_manager, tuple(args))
+            for args in manifest.get('json', [])
+        ]
+        if not self.headless:
+            jobs.extend(
+                (self.image_manager, (name,))
+                for name in manifest.get('images', [])
+            )
+            jobs.extend(
+                (self.font_manager, tuple(args))
+                for args in manifest.get('fonts', [])
+            )
+        self.set_image_modes(manifest.get('modes', {}))
+        total = len(jobs)
+        if progress is not None:
+            progress(0, total)
+        pool = ThreadPool(workers)
+        try:
+            decoded = pool.imap_unordered(_decode_job, jobs)
+            for done, (manager, args, asset) in enumerate(decoded, 1):
+                manager.put(args, manager.finish(asset, *args))
+                if progress is not None:
+                    progress(done, total)
+        finally:
+            pool.close()
+            pool.join()
+
+    def cache_stats(self):
+        """
+        Returns a dictionary of the number and bytes of the cached assets, and
+        the cache's hits, misses and evictions
+        """
+        with self.lock:
+            return self.cache.stats()
 
     def _get_asset(self, manager, *args):
+        self._record(manager, args)
         return manager.get(*args)
 
     def get_json(self, sub_path, filename):
         return self._get_asset(self.json_manager, sub_path, filename)
 
+    def get_json_lines(self, sub_path, filename):
+        return self._get_asset(self.json_lines_manager, sub_path, filename)
+
     def get_image(self, filename):
         return self._get_asset(self.image_manager, filename)
 
@@ -128,3 +545,25 @@ class Manager(object):
     def get_font(self, filename, font_size=16):
         return self._get_asset(self.font_manager, filename, font_size)
 
+    def get_chunked_map(self, filename):
+        return self._get_asset(self.chunked_map_manager, filename)
+
+
+class HeadlessManager(Manager):
+    """
+    A Manager for running games without a display, such as in simulations.
+    JSON files and maps are loaded as usual, but images, sprites and fonts
+    are not loaded. Their arguments are returned in place of them, so
+    pygame is not needed.
+    """
+
+    headless = True
+
+    def get_image(self, filename):
+        return filename
+
+    def get_sprite(self, filename, *args):
+        return (filename,) + args
+
+    def get_font(self, filename, font_size=16):
+        return (filename, font_size)
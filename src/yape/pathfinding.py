@@ -0,0 +1,105 @@
+from array import array
+from collections import deque
+
+
+# The distance given to cells that can not be reached
+UNREACHABLE = -1
+
+
+def _neighbors(index, width, size):
+    """
+    Returns a list of the indexes of the cells left, right, above and below
+    the cell at `index` of a grid `width` cells wide with `size` cells, in
+    row-major order, that are within the grid.
+    """
+    x = index % width
+    neighbors = []
+    if x > 0:
+        neighbors.append(index - 1)
+    if x < width - 1:
+        neighbors.append(index + 1)
+    if index >= width:
+        neighbors.append(index - width)
+    if index + width < size:
+        neighbors.append(index + width)
+    return neighbors
+
+
+def distance_field(solids, width, height, start, limit=None):
+    """
+    Given a sequence of `solids` for a grid of `width` by `height` cells in
+    row-major order, returns an array of the number of steps needed to reach
+    each cell from the `start` (x, y) cell, moving up, down, left or right and
+    never onto a cell that is solid. Cells that can not be reached are given
+    the value UNREACHABLE. If a `limit` is given, cells that are further than
+    `limit` steps away are treated as unreachable.
+
+    This is computed once for a target, such as the player, after which any
+    number of agents may find their next step toward the target by comparing
+    the distances of their neighboring cells.
+    """
+    size = width * height
+    distances = array('i', [UNREACHABLE]) * size
+    start_x, start_y = start
+    if not (0 <= start_x < width and 0 <= start_y < height):
+        return distances
+    start_index = start_y * width + start_x
+    distances[start_index] = 0
+    queue = deque([start_index])
+    while queue:
+        index = queue.popleft()
+        distance = distances[index] + 1
+        if limit is not None and distance > limit:
+            continue
+        for neighbor in _neighbors(index, width, size):
+            if distances[neighbor] == UNREACHABLE and not solids[neighbor]:
+                distances[neighbor] = distance
+                queue.append(neighbor)
+    return distances
+
+
+class DistanceField(object):
+    """
+    The distances computed by distance_field for a window of a larger grid,
+    where the window is `width` by `height` cells with its top left cell at
+    `origin`. Cells outside of the window are unreachable.
+    """
+
+    def __init__(self, distances, origin, width, height):
+        self.distances = distances
+        self.origin = origin
+        self.width = width
+        self.height = height
+
+    def get(self, x, y):
+        """Returns the distance of the cell at x, y in grid coordinates"""
+        origin_x, origin_y = self.origin
+        x, y = x - origin_x, y - origin_y
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.distances[y * self.width + x]
+        return UNREACHABLE
+
+
+def label_regions(solids, width, height):
+    """
+    Given a sequence of `solids` for a grid of `width` by `height` cells in
+    row-major order, returns an array that labels each cell with the number
+    of the connected region of free cells it belongs to. Regions are numbered
+    from 0 and solid cells are labeled UNREACHABLE.
+    """
+    size = width * height
+    labels = array('i', [UNREACHABLE]) * size
+    region = 0
+    for start_index in xrange(size):
+        if solids[start_index] or labels[start_index] != UNREACHABLE:
+            continue
+        labels[start_index] = region
+        queue = deque([start_index])
+        while queue:
+            index = queue.popleft()
+            for neighbor in _neighbors(index, width, size):
+                if labels[neighbor] == UNREACHABLE and not solids[neighbor]:
+                    labels[neighbor] = region
+                    queue.append(neighbor)
+        region += 1
+    return labels
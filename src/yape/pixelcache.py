@@ -0,0 +1,90 @@
+import os
+import mmap
+import struct
+import thread
+from hashlib import sha1
+
+try:
+    import pygame
+except ImportError:
+    pygame = None
+
+
+# The header of a cache entry: the modification time and size of the image
+# file, the width and height of the image and its pixel format
+ENTRY_HEADER = struct.Struct('<dQII4s')
+
+
+class PixelCache(object):
+    """
+    A directory of the decoded pixels of image files, so that an image is
+    only decoded the first time it is loaded. Entries are named by a hash of
+    the image's path and hold its raw pixels in `pixel_format`, which are
+    mapped into memory when read. An entry is only used while the image's
+    modification time and size match those it was written with, so changed
+    images are decoded and written again.
+    """
+
+    def __init__(self, directory, pixel_format='RGBA'):
+        self.directory = directory
+        self.pixel_format = pixel_format
+
+    def _get_entry_path(self, path):
+        key = sha1(os.path.abspath(path)).hexdigest()
+        return os.path.join(self.directory, key + '.px')
+
+    def _get_header(self, path, size):
+        stat = os.stat(path)
+        width, height = size
+        return ENTRY_HEADER.pack(
+            stat.st_mtime, stat.st_size, width, height, self.pixel_format
+        )
+
+    def load(self, path):
+        """
+        Returns a Surface of the image at `path` from its cache entry, or
+        None if there is no entry for the image as it is now.
+        """
+        try:
+            with open(self._get_entry_path(path), 'rb') as f:
+                header = f.read(ENTRY_HEADER.size)
+                width, height = ENTRY_HEADER.unpack(header)[2:4]
+                if header != self._get_header(path, (width, height)):
+                    return None
+                pixels = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, OSError, struct.error, ValueError):
+            return None
+        # The surface reads its pixels from the mapped file after the header
+        # without copying them
+        return pygame.image.frombuffer(
+            buffer(pixels, ENTRY_HEADER.size), (width, height),
+            self.pixel_format
+        )
+
+    def save(self, path, image):
+        """
+        Writes the pixels of `image`, decoded from the file at `path`, to its
+        cache entry. Does nothing if the entry can not be written.
+        """
+        entry_path = self._get_entry_path(path)
+        temp_path = '{0}.{1}.{2}.tmp'.format(
+            entry_path, os.getpid(), thread.get_ident()
+        )
+        if not os.path.isdir(self.directory):
+            try:
+                os.makedirs(self.directory)
+            except OSError:
+                # Another thread or process may have just made it
+                pass
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(self._get_header(path, image.get_size()))
+                f.write(pygame.image.tostring(image, self.pixel_format))
+            # Replace the entry at once, so that a partly written entry is
+            # never read
+            os.rename(temp_path, entry_path)
+        except (IOError, OSError):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
@@ -0,0 +1,80 @@
+import sys
+import threading
+
+from yape.cache import LRUCache
+
+
+class _Job(object):
+    """The result of loading a value on a worker thread"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.exc_info = None
+
+
+class Preloader(object):
+    """
+    Loads values by key on worker threads ahead of when they are needed, and
+    keeps the `capacity` most recently used values so that using them again
+    is instant. `load` is called with a key and returns the value for it.
+
+    Work that must be done on the thread that uses the values, such as on
+    pygame's main thread, may be given as `finish`. It is called by get with
+    the key and the loaded value, and returns the value that is kept.
+    """
+
+    def __init__(self, load, capacity=3, finish=None):
+        self.load = load
+        self.finish = finish
+        self.cache = LRUCache(capacity)
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def prefetch(self, key):
+        """
+        Starts loading the value for `key` on a worker thread, unless it is
+        already loaded or being loaded.
+        """
+        with self.lock:
+            if key in self.cache or key in self.pending:
+                return
+            job = self.pending[key] = _Job()
+        thread = threading.Thread(target=self._run, args=(key, job))
+        thread.daemon = True
+        thread.start()
+
+    def _run(self, key, job):
+        try:
+            job.value = self.load(key)
+        except Exception:
+            job.exc_info = sys.exc_info()
+        finally:
+            job.done.set()
+
+    def get(self, key):
+        """
+        Returns the value for `key`. Waits for the value if it is being loaded
+        on a worker thread, or loads it on the calling thread if it is not,
+        then finishes it on the calling thread. Errors raised while loading on
+        a worker thread are raised here.
+        """
+        with self.lock:
+            value = self.cache.get(key)
+            if value is not None:
+                return value
+            job = self.pending.get(key)
+        if job is None:
+            value = self.load(key)
+        else:
+            job.done.wait()
+            with self.lock:
+                self.pending.pop(key, None)
+            if job.exc_info is not None:
+                raise job.exc_info[0], job.exc_info[1], job.exc_info[2]
+            value = job.value
+        if self.finish is not None:
+            value = self.finish(key, value)
+        with self.lock:
+            self.cache[key] = value
+        return value
@@ -0,0 +1,49 @@
+from contextlib import contextmanager
+from timeit import default_timer
+
+
+class PhaseTimer(object):
+    """
+    Accumulates the wall clock time spent in each named phase of the game
+    loop, such as 'events', 'logic' and 'render', and counts frames. When
+    `enabled` is False, phases are not timed, so the timer may be left in the
+    game loop at no real cost.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.totals = {}
+        self.frames = 0
+        self.started_at = default_timer()
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = default_timer()
+        try:
+            yield
+        finally:
+            self.totals[name] = self.totals.get(name, 0) + default_timer() - start
+
+    def frame(self):
+        self.frames += 1
+
+    def report(self):
+        """
+        Returns a list of strings reporting the frame count, frames per second
+        and the average milliseconds per frame spent in each phase.
+        """
+        elapsed = default_timer() - self.started_at
+        frames = self.frames or 1
+        lines = [
+            'Frames: {0}'.format(self.frames),
+            'Elapsed: {0:.2f}s'.format(elapsed),
+            'FPS: {0:.1f}'.format(self.frames / elapsed if elapsed else 0),
+        ]
+        for name, total in sorted(self.totals.items()):
+            lines.append('{0}: {1:.3f}ms/frame ({2:.2f}s total)'.format(
+                name, total * 1000 / frames, total
+            ))
+        return lines
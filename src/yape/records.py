@@ -0,0 +1,71 @@
+import os
+import json
+import struct
+from array import array
+
+
+# The header of an index file: the modification time and size of the indexed
+# file, and the size in bytes of each offset
+INDEX_HEADER = struct.Struct('<dQB')
+
+
+class JSONLinesFile(object):
+    """
+    A read-only sequence of the JSON values on each non-blank line of a file.
+    Only the byte offset of each line is indexed up front, and a value is
+    read and parsed when it is accessed. The index is saved alongside the
+    file, as `<filename>.idx`, and reused until the file changes, so opening
+    a file takes the same time no matter how many lines it has.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + '.idx'
+        self.offsets = self._load_index()
+        self.file = open(path, 'rb')
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        self.file.seek(self.offsets[index])
+        return json.loads(self.file.readline())
+
+    def _load_index(self):
+        stat = os.stat(self.path)
+        offsets = array('L')
+        try:
+            with open(self.index_path, 'rb') as f:
+                header = f.read(INDEX_HEADER.size)
+                mtime, size, itemsize = INDEX_HEADER.unpack(header)
+                if (mtime, size, itemsize) == (
+                        stat.st_mtime, stat.st_size, offsets.itemsize):
+                    count = (os.fstat(f.fileno()).st_size - INDEX_HEADER.size) // itemsize
+                    offsets.fromfile(f, count)
+                    return offsets
+        except (IOError, EOFError, struct.error):
+            pass
+        offsets = self._build_index()
+        try:
+            with open(self.index_path, 'wb') as f:
+                f.write(INDEX_HEADER.pack(
+                    stat.st_mtime, stat.st_size, offsets.itemsize
+                ))
+                offsets.tofile(f)
+        except IOError:
+            # The index could not be saved, so it is rebuilt next time
+            pass
+        return offsets
+
+    def _build_index(self):
+        offsets = array('L')
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for line in iter(f.readline, ''):
+                if line.strip():
+                    offsets.append(offset)
+                offset += len(line)
+        return offsets
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,105 @@
+import json
+
+import pygame
+
+
+class ReplayFinished(Exception):
+    """Raised by an EventPlayer when it has no more frames to replay"""
+    pass
+
+
+# The types of event attribute values that are written to a recording
+_SERIALIZABLE_TYPES = (bool, int, long, float, basestring, type(None))
+
+
+class EventRecorder(object):
+    """
+    Wraps an event source, such as a Dispatch's event_source, and writes the
+    events of each frame to a file so that the session can be replayed with
+    an EventPlayer. Also provides a `get_ticks` function for a Clock, so that
+    the time read on each frame is recorded with its events. The `header` is
+    written on the first line, and may hold anything needed to reproduce the
+    session, such as a random seed.
+    """
+
+    def __init__(self, path, source, get_ticks=None, header=None):
+        self.file = open(path, 'w')
+        self.source = source
+        self._get_ticks = get_ticks or pygame.time.get_ticks
+        self.frame = None
+        self.file.write(json.dumps(header or {}) + '\n')
+
+    def _serialize(self, event):
+        attrs = dict(
+            (key, value) for key, value in event.dict.items()
+            if isinstance(value, _SERIALIZABLE_TYPES)
+        )
+        return {'type': event.type, 'attrs': attrs}
+
+    def _record(self, events):
+        self._write_frame()
+        self.frame = {
+            'events': [self._serialize(event) for event in events],
+            'ticks': None,
+        }
+        return events
+
+    def _write_frame(self):
+        if self.frame is not None:
+            self.file.write(json.dumps(self.frame) + '\n')
+            self.frame = None
+
+    def get(self):
+        return self._record(self.source.get())
+
+    def wait(self):
+        return self._record(self.source.wait())
+
+    def get_ticks(self):
+        ticks = self._get_ticks()
+        if self.frame is not None:
+            self.frame['ticks'] = ticks
+        return ticks
+
+    def close(self):
+        self._write_frame()
+        self.file.close()
+
+
+class EventPlayer(object):
+    """
+    An event source that replays a file written by an EventRecorder, one
+    frame of events per call to `get` or `wait`. Its `get_ticks` function
+    returns the time recorded for the current frame, so that a Clock using it
+    runs the same logic steps as the recorded session. Raises ReplayFinished
+    once all frames have been replayed.
+    """
+
+    def __init__(self, path):
+        with open(path) as f:
+            lines = [line for line in f if line.strip()]
+        self.header = json.loads(lines[0]) if lines else {}
+        self.frames = [json.loads(line) for line in lines[1:]]
+        self.index = 0
+        self.ticks = 0
+
+    def _deserialize(self, event_data):
+        attrs = dict(
+            (str(key), value) for key, value in event_data['attrs'].items()
+        )
+        return pygame.event.Event(event_data['type'], attrs)
+
+    def get(self):
+        if self.index >= len(self.frames):
+            raise ReplayFinished()
+        frame = self.frames[self.index]
+        self.index += 1
+        if frame['ticks'] is not None:
+            self.ticks = frame['ticks']
+        return [self._deserialize(event) for event in frame['events']]
+
+    def wait(self):
+        return self.get()
+
+    def get_ticks(self):
+        return self.ticks
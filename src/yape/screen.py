@@ -4,6 +4,8 @@ import pygame
 from pygame import Surface, display
 
 from components import Component, LoadableComponent
+from cache import LRUCache
+from text import TextLayout
 
 
 class Screen(LoadableComponent):
@@ -27,6 +29,15 @@ class Screen(LoadableComponent):
     ]
 
     background = None
+    # When True, only the areas drawn onto during a frame and the frame before
+    # it are restored from the background and updated, rather than flipping
+    # the whole display. May be enabled with `dirty_rects` in screen.json
+    dirty_rects = False
+    # The number of rendered text surfaces kept for reuse by draw_text
+    text_cache_size = 256
+    # The maximum frame rate and the length of a logic step in milliseconds
+    fps = 30
+    timestep = None
 
     def __init__(self, *args, **kwargs):
         self.camera_class = kwargs.pop('camera', PerTileCamera)
@@ -41,22 +52,67 @@ class Screen(LoadableComponent):
     def post_process(self):
         Camera = self.camera_class
         self.camera = Camera(self.manager, self.raw_data)
+        self.text_cache = LRUCache(self.text_cache_size)
+        self.text_layout = TextLayout()
 
     def set_background(self, color='black'):
         background = Surface(self.context.get_size()).convert()
         background.fill(self.get_color(color))
         self.background = background
+        self._static_key = None
+        # The whole display must be updated on the next frame
+        self._dirty = [self.context.get_rect()]
 
     @contextmanager
     def display_cycle(self):
         """
         A context manager that applies the background to the screen, calls the
-        display functions within the block and then flips the display.
+        display functions within the block and then flips the display. In
+        dirty rect mode, the background is only applied to the areas drawn
+        onto during the previous frame, and only those areas and the areas
+        drawn onto within the block are updated.
         """
-        if self.background:
-            self.context.blit(self.background, (0, 0))
-        yield
-        pygame.display.flip()
+        if self.dirty_rects:
+            previous, self._dirty = self._dirty, []
+            if self.background:
+                for rect in previous:
+                    self.context.blit(self.background, rect, rect)
+            yield
+            pygame.display.update(previous + self._dirty)
+        else:
+            if self.background:
+                self.context.blit(self.background, (0, 0))
+            yield
+            pygame.display.flip()
+
+    def draw_static(self, key, draw_func):
+        """
+        Draws content that rarely changes, such as the map, onto the
+        background so that it is restored along with the background on each
+        frame. `draw_func` is called with the background surface, but only if
+        `key` differs from the key given on the previous call.
+        """
+        if key == self._static_key:
+            return
+        self._static_key = key
+        draw_func(self.background)
+        self.draw(self.background, (0, 0))
+
+    def draw_progress(self, done, total, image=None):
+        """
+        Draws a loading bar for `done` out of `total` along the bottom of the
+        display, over `image` if given, and updates the display at once.
+        """
+        self.context.blit(self.background, (0, 0))
+        if image:
+            self.context.blit(image, (0, 0))
+        width, height = self.context.get_size()
+        bar_width = width * done // total if total else width
+        bar = pygame.Rect(0, height - 8, bar_width, 8)
+        self.context.fill(self.get_color('black'), bar)
+        display.flip()
+        # Keep the window responsive while loading
+        pygame.event.pump()
 
     def get_color(self, color):
         return pygame.color.THECOLORS.get(color, None) \
@@ -65,10 +121,36 @@ class Screen(LoadableComponent):
     def get_surface(self, width, height):
         return Surface((width, height))
 
-    def draw(self, image, coordinates, surface=None):
+    def draw(self, image, coordinates, surface=None, area=None):
         surface = surface or self.context
         if image:
-            surface.blit(image, coordinates)
+            rect = surface.blit(image, coordinates, area)
+            if self.dirty_rects and surface is self.context:
+                self._dirty.append(rect)
+
+    def draw_many(self, blit_sequence, surface=None):
+        """
+        Draws each (image, coordinates) two-tuple of `blit_sequence` with a
+        single call to Surface.blits, where that is available, rather than
+        one call to Surface.blit per image.
+        """
+        surface = surface or self.context
+        blit_sequence = [
+            (image, coordinates)
+            for image, coordinates in blit_sequence
+            if image
+        ]
+        if not blit_sequence:
+            return
+        if hasattr(surface, 'blits'):
+            rects = surface.blits(blit_sequence)
+        else:
+            rects = [
+                surface.blit(image, coordinates)
+                for image, coordinates in blit_sequence
+            ]
+        if self.dirty_rects and surface is self.context:
+            self._dirty.extend(rects)
 
     def draw_tile(self, image, coordinates, surface=None):
         x, y = coordinates
@@ -86,13 +168,47 @@ class Screen(LoadableComponent):
                 image, (x + x_offset, y + y_offset), surface=surface
             )
 
-    def draw_text(self, font, label, coordinates, color=None, surface=None):
+    def draw_tiles_relative(self, tiles, container, player, surface=None):
+        """
+        Draws each (image, coordinates) two-tuple of `tiles` in one batch,
+        where the coordinates are in tiles and are offset by the camera. Tiles
+        that fall outside of the map display are skipped.
+        """
+        x_offset, y_offset = self.camera.get_offset(container, player)
+        tile_width, tile_height = self.tile_width, self.tile_height
+        display_width = self.map_display_width
+        display_height = self.map_display_height
+        blit_sequence = []
+        for image, (x, y) in tiles:
+            rel_x, rel_y = x + x_offset, y + y_offset
+            if 0 <= rel_x < display_width and 0 <= rel_y < display_height:
+                blit_sequence.append(
+                    (image, (rel_x * tile_width, rel_y * tile_height))
+                )
+        self.draw_many(blit_sequence, surface=surface)
+
+    def render_text(self, font, label, color=None, antialias=True):
+        """
+        Returns a surface with the `label` rendered in the given `font` and
+        `color`. Rendered surfaces are cached, so drawing the same text on
+        each frame does not render it again.
+        """
+        color = color or 'white'
+        key = (font, label, color, antialias)
+        text = self.text_cache.get(key)
+        if text is None:
+            text = font.render(label, antialias, self.get_color(color))
+            self.text_cache[key] = text
+        return text
+
+    def draw_text(self, font, label, coordinates, color=None, surface=None,
+                  antialias=True):
         surface = surface or self.context
         if font is not None and label:
-            text = font.render(label, True, self.get_color(color or 'white'))
+            text = self.render_text(font, label, color, antialias)
             textpos = text.get_rect()
             textpos.move_ip(*coordinates)
-            surface.blit(text, textpos)
+            self.draw(text, textpos, surface=surface)
 
 
 class PerTileCamera(Component):
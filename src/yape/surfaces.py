@@ -0,0 +1,99 @@
+"""
+Chooses how to convert images for the display by their transparency. Opaque
+images and images whose pixels are either fully transparent or fully opaque
+are blitted several times faster without per-pixel alpha, so only images that
+need it are converted with it.
+"""
+
+try:
+    import pygame
+except ImportError:
+    pygame = None
+
+# Images without transparency are converted to the display's format
+OPAQUE = 'opaque'
+# Images whose pixels are either fully transparent or fully opaque use a
+# run-length encoded colorkey for the transparent pixels
+COLORKEY = 'colorkey'
+# Images with partly transparent pixels keep per-pixel alpha
+ALPHA = 'alpha'
+
+MODES = (OPAQUE, COLORKEY, ALPHA)
+
+# The color given to transparent pixels of COLORKEY images
+KEY_COLOR = (255, 0, 255)
+
+
+def classify(image):
+    """Returns the mode that `image` should be converted with"""
+    if image.get_colorkey() is not None:
+        return COLORKEY
+    if not image.get_flags() & pygame.SRCALPHA:
+        return OPAQUE
+    width, height = image.get_size()
+    # Pixels with an alpha above the threshold are set in each mask
+    opaque = pygame.mask.from_surface(image, 254).count()
+    if opaque == width * height:
+        return OPAQUE
+    visible = pygame.mask.from_surface(image, 0).count()
+    if visible == opaque and not uses_key_color(image):
+        return COLORKEY
+    return ALPHA
+
+
+def uses_key_color(image):
+    """Returns True if any visible pixel of `image` is KEY_COLOR"""
+    key = pygame.mask.from_threshold(
+        image, KEY_COLOR + (255,), (1, 1, 1, 255)
+    )
+    return key.count() > 0
+
+
+def convert(image, mode):
+    """
+    Returns a copy of `image` converted to the display's format for `mode`.
+    """
+    if mode == OPAQUE:
+        return image.convert()
+    if mode == COLORKEY:
+        key = image.get_colorkey()
+        if key is not None:
+            converted = image.convert()
+        else:
+            key = KEY_COLOR
+            converted = pygame.Surface(image.get_size()).convert()
+            converted.fill(key)
+            converted.blit(image, (0, 0))
+        converted.set_colorkey(key, pygame.RLEACCEL)
+        return converted
+    return image.convert_alpha()
+
+
+def create_sheet(size, mode):
+    """
+    Returns an empty surface of `size` for packing images of `mode` onto,
+    such as a texture atlas.
+    """
+    if mode == ALPHA:
+        return pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+    sheet = pygame.Surface(size).convert()
+    if mode == COLORKEY:
+        sheet.fill(KEY_COLOR)
+        sheet.set_colorkey(KEY_COLOR)
+    return sheet
+
+
+def copy_to_sheet(sheet, image, position, mode):
+    """
+    Copies `image`, converted for `mode`, onto `sheet` at `position` and
+    returns the subsurface of the sheet that it was copied to.
+    """
+    if mode == ALPHA:
+        # Copy the pixels, alpha included, onto the transparent sheet
+        sheet.blit(image, position, special_flags=pygame.BLEND_RGBA_MAX)
+    else:
+        sheet.blit(image, position)
+    subsurface = sheet.subsurface(pygame.Rect(position, image.get_size()))
+    if mode == COLORKEY:
+        subsurface.set_colorkey(sheet.get_colorkey(), pygame.RLEACCEL)
+    return subsurface
@@ -0,0 +1,128 @@
+"""
+Moves large numbers of identical agents, such as monsters, with NumPy. NumPy
+is optional, and `available` is False when it is not installed.
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from yape.pathfinding import UNREACHABLE
+
+available = numpy is not None
+
+# The moves an agent may make in the order they are preferred when ranked
+# equally: right, left, stay, up and down
+MOVES_X = (1, -1, 0, 0, 0)
+MOVES_Y = (0, 0, 0, -1, 1)
+
+
+class Swarm(object):
+    """
+    The positions of a group of agents, kept in arrays so that every agent
+    can be moved with one vectorized step. Agents are identified by their
+    index in the starting `positions`, a list of (x, y) tuples, and keep
+    their index when others are removed.
+    """
+
+    def __init__(self, positions):
+        count = len(positions)
+        self.xs = numpy.fromiter((x for x, y in positions), numpy.int32, count)
+        self.ys = numpy.fromiter((y for x, y in positions), numpy.int32, count)
+        self.alive = numpy.ones(count, bool)
+        self.moves_x = numpy.array(MOVES_X, numpy.int32)
+        self.moves_y = numpy.array(MOVES_Y, numpy.int32)
+
+    def count(self):
+        return int(self.alive.sum())
+
+    def remove(self, index):
+        self.alive[index] = False
+
+    def at(self, position):
+        """Returns a list of the indexes of the agents at `position`"""
+        x, y = position
+        found = (self.xs == x) & (self.ys == y) & self.alive
+        return numpy.flatnonzero(found).tolist()
+
+    def has(self, position):
+        x, y = position
+        return bool(((self.xs == x) & (self.ys == y) & self.alive).any())
+
+    def in_rect(self, x, y, width, height):
+        """
+        Yields an (index, (x, y)) tuple for each agent in the rectangle of
+        `width` by `height` cells with its top left cell at x, y.
+        """
+        xs, ys = self.xs, self.ys
+        found = (
+            self.alive & (xs >= x) & (xs < x + width) &
+            (ys >= y) & (ys < y + height)
+        )
+        for index in numpy.flatnonzero(found):
+            yield int(index), (int(xs[index]), int(ys[index]))
+
+    def step(self, solids, width, height, field, target):
+        """
+        Moves every agent one step toward `target`, an (x, y) cell, and
+        returns True if any of them is on it afterwards.
+
+        `solids` is a boolean array of the solid cells of the `width` by
+        `height` grid in row-major order, and `field` is the
+        pathfinding.DistanceField to the target. Moves are ranked by the steps
+        to the target along the field, then by the Manhattan distance to it.
+        Agents never move onto solids or other agents, and when several
+        agents choose the same cell, the agent with the lowest index gets it
+        and the others stay where they are.
+        """
+        alive = numpy.flatnonzero(self.alive)
+        if not len(alive):
+            return False
+        xs, ys = self.xs[alive], self.ys[alive]
+        # One row of candidate cells for each agent
+        to_x = xs[:, None] + self.moves_x
+        to_y = ys[:, None] + self.moves_y
+        valid = (to_x >= 0) & (to_x < width) & (to_y >= 0) & (to_y < height)
+        cells = numpy.where(valid, to_y * width + to_x, 0)
+        valid &= ~solids[cells]
+        # Agents may stay put, but not move onto another agent. The occupied
+        # cells are looked up in a sorted array of their indexes, so a step
+        # costs the same no matter how large the map is
+        occupied = numpy.sort(ys * width + xs)
+        found = numpy.searchsorted(occupied, cells)
+        taken = occupied[numpy.minimum(found, len(occupied) - 1)] == cells
+        staying = (to_x == xs[:, None]) & (to_y == ys[:, None])
+        valid &= staying | ~taken
+        # Rank the candidates, with unreachable cells ranked after the rest
+        origin_x, origin_y = field.origin
+        field_x, field_y = to_x - origin_x, to_y - origin_y
+        in_field = (
+            (field_x >= 0) & (field_x < field.width) &
+            (field_y >= 0) & (field_y < field.height)
+        )
+        distances = numpy.frombuffer(field.distances, numpy.intc)
+        steps = numpy.where(
+            in_field,
+            distances[numpy.where(in_field, field_y * field.width + field_x, 0)],
+            UNREACHABLE
+        ).astype(numpy.int64)
+        steps[steps == UNREACHABLE] = width * height
+        target_x, target_y = target
+        manhattan = numpy.abs(to_x - target_x) + numpy.abs(to_y - target_y)
+        ranks = steps * (width + height) + manhattan
+        ranks[~valid] = numpy.iinfo(numpy.int64).max
+        # argmin picks the first of equally ranked moves
+        choice = ranks.argmin(axis=1)
+        rows = numpy.arange(len(alive))
+        new_x, new_y = to_x[rows, choice], to_y[rows, choice]
+        # Resolve agents choosing the same cell in favour of the lowest index
+        movers = numpy.flatnonzero((new_x != xs) | (new_y != ys))
+        if len(movers):
+            targets = new_y[movers] * width + new_x[movers]
+            unique, first = numpy.unique(targets, return_index=True)
+            winners = movers[first]
+            self.xs[alive[winners]] = new_x[winners]
+            self.ys[alive[winners]] = new_y[winners]
+        moved_x, moved_y = self.xs[alive], self.ys[alive]
+        return bool(((moved_x == target_x) & (moved_y == target_y)).any())
@@ -0,0 +1,85 @@
+from yape.cache import LRUCache
+
+
+class TextLayout(object):
+    """
+    Lays out paragraphs of text into lines that fit within a width in pixels,
+    as measured with a font's metrics. The widths of the most recently
+    measured words are cached by font and word, and each laid out paragraph
+    is cached by its text, font and width, so laying out the same text again
+    costs a lookup.
+    """
+
+    def __init__(self, cache_size=256, width_cache_size=4096):
+        self.widths = LRUCache(width_cache_size)
+        self.paragraphs = LRUCache(cache_size)
+
+    def measure(self, font, text):
+        """Returns the width in pixels of the `text` rendered in the `font`"""
+        key = (font, text)
+        width = self.widths.get(key)
+        if width is None:
+            width = self.widths[key] = font.size(text)[0]
+        return width
+
+    def get_line_height(self, font):
+        return font.get_linesize()
+
+    def wrap(self, text, font, width):
+        """
+        Returns a tuple of the lines of the paragraph `text` wrapped to fit
+        within `width` pixels. Words wider than `width` are split over two or
+        more lines, with hyphens appended at the end of all but the last part.
+        """
+        key = (text, font, width)
+        lines = self.paragraphs.get(key)
+        if lines is None:
+            lines = tuple(self._wrap(text, font, width))
+            self.paragraphs[key] = lines
+        return lines
+
+    def layout(self, paragraphs, font, width):
+        """
+        Returns a tuple of the lines of each of the `paragraphs`, wrapped to
+        fit within `width` pixels. Empty paragraphs are kept as blank lines.
+        """
+        lines = []
+        for paragraph in paragraphs:
+            lines.extend(self.wrap(paragraph, font, width))
+        return tuple(lines)
+
+    def _wrap(self, text, font, width):
+        space_width = self.measure(font, ' ')
+        lines = []
+        current, current_width = [], 0
+        for word in text.split(' '):
+            word_width = self.measure(font, word)
+            if current and current_width + space_width + word_width <= width:
+                current.append(word)
+                current_width += space_width + word_width
+                continue
+            if current:
+                lines.append(' '.join(current))
+            if word_width <= width:
+                current, current_width = [word], word_width
+            else:
+                # Word is wider than the line, hyphenate
+                parts = self._hyphenate(word, font, width)
+                lines.extend(parts[:-1])
+                current = [parts[-1]]
+                current_width = self.measure(font, parts[-1])
+        lines.append(' '.join(current))
+        return lines
+
+    def _hyphenate(self, word, font, width):
+        hyphen_width = self.measure(font, '-')
+        parts = []
+        start = 0
+        while start < len(word):
+            end = start + 1
+            while (end < len(word) and
+                    font.size(word[start:end + 1])[0] + hyphen_width <= width):
+                end += 1
+            parts.append(word[start:end])
+            start = end
+        return [part + '-' for part in parts[:-1]] + parts[-1:]
@@ -0,0 +1,104 @@
+import heapq
+from itertools import count
+
+
+class Timer(object):
+    """
+    A callback registered with a Scheduler, due at `when` in milliseconds.
+    Repeating timers have an `interval` and are due again that long after
+    they run.
+    """
+
+    def __init__(self, when, interval, callback, args):
+        self.when = when
+        self.interval = interval
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def __repr__(self):
+        name = getattr(self.callback, '__name__', repr(self.callback))
+        if self.interval:
+            return u'{0} at {1} every {2}'.format(name, self.when, self.interval)
+        return u'{0} at {1}'.format(name, self.when)
+
+
+class Scheduler(object):
+    """
+    Runs one-shot and repeating callbacks at given times. Timers are kept in a
+    heap ordered by the time they are due, so running the scheduler only does
+    work for the timers that are due. Times are in milliseconds of game time,
+    such as the ticks of a Clock, and `now` is the time of the last run.
+
+    Callbacks are called with the arguments given when they were registered,
+    followed by any arguments given to run.
+    """
+
+    def __init__(self):
+        self.now = 0
+        self.queue = []
+        # Breaks ties between timers due at the same time in the order they
+        # were registered
+        self._order = count()
+
+    def _push(self, timer):
+        heapq.heappush(self.queue, (timer.when, next(self._order), timer))
+        return timer
+
+    def call_at(self, when, callback, *args):
+        """Calls `callback` once at `when`. Returns the Timer"""
+        return self._push(Timer(when, None, callback, args))
+
+    def call_later(self, delay, callback, *args):
+        """Calls `callback` once, `delay` milliseconds from now"""
+        return self.call_at(self.now + delay, callback, *args)
+
+    def call_every(self, interval, callback, *args):
+        """
+        Calls `callback` every `interval` milliseconds, starting `interval`
+        milliseconds from now, until the timer is cancelled. Returns the Timer
+        """
+        return self._push(Timer(self.now + interval, interval, callback, args))
+
+    def cancel(self, timer):
+        """
+        Stops `timer` from running. Cancelled timers are dropped from the
+        queue when they become due, rather than searched for now.
+        """
+        if timer is not None:
+            timer.cancelled = True
+
+    def clear(self):
+        self.queue = []
+
+    def run(self, now, *args):
+        """
+        Runs every timer that is due at `now`, in the order they are due.
+        A repeating timer runs at most once per call, so a timer that fell
+        behind, such as while the game was paused, does not run in a burst.
+        """
+        self.now = now
+        queue = self.queue
+        due = []
+        while queue and queue[0][0] <= now:
+            due.append(heapq.heappop(queue)[2])
+        for timer in due:
+            if timer.cancelled:
+                continue
+            if timer.interval:
+                timer.when += timer.interval
+                if timer.when <= now:
+                    timer.when = now + timer.interval
+                self._push(timer)
+            timer.callback(*(timer.args + args))
+
+    def timers(self):
+        """Returns a list of the timers that have not run, in order due"""
+        return [
+            timer for when, order, timer in sorted(self.queue)
+            if not timer.cancelled
+        ]
+
+    def report(self):
+        """Returns a list of lines describing the pending timers"""
+        return [repr(timer) for timer in self.timers()]